@@ -1,4 +1,4 @@
 """Analyzer package."""
-from .analyzer import Analyzer, AnalyzerPool
+from .analyzer import Analyzer, AnalyzerPool, install_uvloop
 
-__all__ = ["Analyzer", "AnalyzerPool"]
+__all__ = ["Analyzer", "AnalyzerPool", "install_uvloop"]
@@ -2,21 +2,68 @@
 Analyzer: Worker that pulls and processes log messages from the Distributor.
 
 Analyzers:
-- Pull work from the Distributor (GET /get_work)
+- Pull work from the Distributor in batches (POST /get_work_batch)
 - Process logs (simulated work)
-- Send heartbeats and status updates
+- Send heartbeats and status updates (over a WebSocket when available)
 - Support configurable concurrency based on weight
 """
 import asyncio
+import functools
 import httpx
+import itertools
 import logging
+import orjson
+import random
+import sys
 import time
-from typing import Optional, List, Union
-from datetime import datetime
+from collections import deque
+from typing import Optional, List, Union, Deque, Iterator, Tuple, Callable
+
+try:
+    from websockets.asyncio.client import connect as _ws_connect
+except ImportError:  # Status updates are then always sent over HTTP
+    _ws_connect = None
 
 logger = logging.getLogger(__name__)
 
 
+def _weight_to_concurrency(weight: float) -> int:
+    """Max concurrent tasks for a weight (0.1 = 1 task, 0.2 = 2 tasks, ...)."""
+    return max(1, int(weight * 10))
+
+
+# Maximum number of analyzers stopped at the same time by AnalyzerPool.stop()
+_STOP_CONCURRENCY = 16
+
+
+# Request bodies are serialized with orjson and sent as raw content
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+def install_uvloop() -> bool:
+    """
+    Use uvloop as the asyncio event loop, if it is installed.
+    
+    Must be called before the event loop is created (i.e. before
+    asyncio.run()). Safe to call more than once. uvloop does not support
+    Windows, where the default loop is always used.
+    
+    Returns:
+        True if uvloop is in use, False if falling back to the default loop
+    """
+    if sys.platform == "win32":
+        return False
+    
+    try:
+        import uvloop
+    except ImportError:
+        logger.debug("uvloop not installed, using default asyncio event loop")
+        return False
+    
+    uvloop.install()
+    return True
+
+
 class Analyzer:
     """
     Log analyzer worker that pulls work from distributor.
@@ -35,7 +82,11 @@ class Analyzer:
         weight: float = 1.0,
         heartbeat_interval: float = 5.0,
         poll_interval: float = 1.0,
-        processing_delay: float = 0.1
+        processing_delay: float = 0.1,
+        client: Optional[httpx.AsyncClient] = None,
+        status_flush_interval: float = 0.05,
+        status_batch_size: int = 64,
+        on_idle: Optional[Callable[["Analyzer"], None]] = None
     ):
         """
         Initialize the analyzer.
@@ -47,6 +98,13 @@ class Analyzer:
             heartbeat_interval: Seconds between heartbeats
             poll_interval: Seconds between work polling attempts
             processing_delay: Simulated processing time per log
+            client: Shared HTTP client to use. If None, the analyzer creates
+                    (and closes) its own.
+            status_flush_interval: Seconds to collect status updates before
+                                   sending them as one batch
+            status_batch_size: Maximum status updates per batch
+            on_idle: Called with this analyzer whenever its last running task
+                     finishes (used by AnalyzerPool)
         """
         self.analyzer_id = analyzer_id
         self.distributor_url = distributor_url.rstrip("/")
@@ -54,23 +112,67 @@ class Analyzer:
         self.heartbeat_interval = heartbeat_interval
         self.poll_interval = poll_interval
         self.processing_delay = processing_delay
+        self.status_flush_interval = status_flush_interval
+        self.status_batch_size = status_batch_size
+        self.on_idle = on_idle
         
         # Calculate max concurrent tasks based on weight
         # Weight 0.1 = 1 task, 0.2 = 2 tasks, 0.3 = 3 tasks, 0.4 = 4 tasks
-        self.max_concurrent_tasks = max(1, int(weight * 10))
+        self.max_concurrent_tasks = _weight_to_concurrency(weight)
+        
+        # HTTP client (keep-alive pool sized for our concurrency so /get_work
+        # and /status calls reuse connections instead of reconnecting).
+        # A client passed in by the pool is shared and owned by the pool.
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_keepalive_connections=max(20, self.max_concurrent_tasks * 4),
+                max_connections=self.max_concurrent_tasks * 8
+            )
+        )
         
-        # HTTP client
-        self.client = httpx.AsyncClient(timeout=10.0)
+        # /get_work_batch request body. Only current_tasks and max_tasks
+        # change between polls; they are filled in just before serializing.
+        # wait_seconds asks the distributor to hold the request open while
+        # the queue is empty rather than re-polling.
+        self._work_request = {
+            "analyzer_id": analyzer_id,
+            "weight": weight,
+            "current_tasks": 0,
+            "max_tasks": 1,
+            "wait_seconds": poll_interval * 10
+        }
         
         # Task tracking
         self.active_tasks: dict[str, asyncio.Task] = {}
-        self.current_task_ids: set[str] = set()
+        # Number of running tasks (kept in step with active_tasks)
+        self._active_count: int = 0
+        
+        # Set whenever a running task finishes (frees a slot)
+        self._slot_available = asyncio.Event()
+        
+        # Outgoing status updates, sent in batches by the status flusher
+        self._status_queue: asyncio.Queue = asyncio.Queue()
+        self._status_flusher_task: Optional[asyncio.Task] = None
+        
+        # Persistent /ws/status connection used by the status flusher. Opened
+        # on first use and reopened after an error; if the distributor can't
+        # be reached over WebSocket at all, updates go to POST /status_batch.
+        self._status_ws_url = "ws" + self.distributor_url[len("http"):] + "/ws/status"
+        self._status_ws = None
+        self._status_ws_enabled = _ws_connect is not None
         
         # Statistics
         self.total_tasks_processed = 0
         self.total_tasks_failed = 0
         self.start_time = None
         
+        # Distributor queue depth from the latest work response (read by the
+        # pool for autoscaling), and when it was received (time.monotonic())
+        self.last_queue_depth: Optional[int] = None
+        self.last_queue_depth_time = 0.0
+        
         # Control
         self.running = False
         self.worker_task: Optional[asyncio.Task] = None
@@ -90,15 +192,44 @@ class Analyzer:
         self.running = True
         self.start_time = time.time()
         
-        # Start the main worker loop
+        # Start the main worker loop and the status flusher
         self.worker_task = asyncio.create_task(self._worker_loop())
+        self._status_flusher_task = asyncio.create_task(self._status_flusher())
         
         self.logger.info("Started")
     
-    async def stop(self):
-        """Stop the analyzer worker."""
+    async def stop(self, wait_for_tasks: bool = True) -> Optional[asyncio.Task]:
+        """
+        Stop the analyzer worker.
+        
+        The worker loop is cancelled first so no new work is pulled, then
+        active tasks are drained (finished, status sent, client closed).
+        
+        Args:
+            wait_for_tasks: If False, don't wait for the drain; it runs in the
+                background and the returned task can be awaited later
+        
+        Returns:
+            The background drain task if wait_for_tasks is False, else None
+        """
         self.running = False
         
+        # Cancel worker loop
+        if self.worker_task:
+            self.worker_task.cancel()
+            try:
+                await self.worker_task
+            except asyncio.CancelledError:
+                pass
+        
+        if not wait_for_tasks:
+            return asyncio.create_task(self._drain())
+        
+        await self._drain()
+        return None
+    
+    async def _drain(self):
+        """Finish active tasks, flush status updates and close the client."""
         # Wait for active tasks to complete
         if self.active_tasks:
             self.logger.info(
@@ -106,71 +237,102 @@ class Analyzer:
             )
             await asyncio.gather(*self.active_tasks.values(), return_exceptions=True)
         
-        # Cancel worker loop
-        if self.worker_task:
-            self.worker_task.cancel()
+        # Deliver any status updates still waiting to be sent
+        if self._status_flusher_task:
+            await self._status_queue.join()
+            self._status_flusher_task.cancel()
             try:
-                await self.worker_task
+                await self._status_flusher_task
             except asyncio.CancelledError:
                 pass
+        await self._close_status_ws()
         
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
         self.logger.info("Stopped")
     
     async def _worker_loop(self):
         """
         Main worker loop that pulls and processes work.
         """
+        # Stagger startup so analyzers started together don't poll in lockstep
+        await asyncio.sleep(random.uniform(0, self.poll_interval))
+        
         while self.running:
             try:
                 # Check if we have capacity for more work
-                if len(self.active_tasks) < self.max_concurrent_tasks:
-                    # Request work from distributor
-                    work = await self._request_work()
-                    
-                    if work and work.get("has_work"):
-                        # Start processing in background
+                free_slots = self.max_concurrent_tasks - self._active_count
+                if free_slots <= 0:
+                    # At capacity, sleep until a running task finishes
+                    self._slot_available.clear()
+                    await self._slot_available.wait()
+                    continue
+                
+                # Request enough work to fill every free slot at once
+                work_items = await self._request_work(free_slots)
+                
+                if work_items:
+                    # Start processing in background
+                    for work in work_items:
                         task_id = work["task_id"]
                         task = asyncio.create_task(
                             self._process_task(task_id, work["log_data"])
                         )
                         self.active_tasks[task_id] = task
-                        self.current_task_ids.add(task_id)
-                    else:
-                        # No work available, wait before polling again
-                        await asyncio.sleep(self.poll_interval * 10)
+                        self._active_count += 1
+                        task.add_done_callback(
+                            functools.partial(self._on_task_done, task_id)
+                        )
+                elif work_items is None:
+                    # Request failed, back off before trying again
+                    await asyncio.sleep(self._jittered(self.poll_interval * 10))
                 else:
-                    # At capacity, wait before checking again
-                    await asyncio.sleep(self.poll_interval)
-                
-                # Clean up completed tasks
-                await self._cleanup_completed_tasks()
+                    # The distributor already held the request open waiting
+                    # for work (long-poll), so only pause briefly
+                    await asyncio.sleep(self._jittered(self.poll_interval))
                 
             except Exception as e:
                 logger.error(f"Error in worker loop: {e}")
                 await asyncio.sleep(1.0)
     
-    async def _request_work(self) -> Optional[dict]:
+    @staticmethod
+    def _jittered(base: float) -> float:
+        """Return base randomized by +/-20% to de-synchronize analyzers."""
+        return base * random.uniform(0.8, 1.2)
+    
+    async def _request_work(self, max_tasks: int) -> Optional[List[dict]]:
         """
-        Request work from the distributor.
+        Request up to max_tasks tasks from the distributor in one round-trip.
+        
+        Args:
+            max_tasks: Maximum number of tasks to receive
         
         Returns:
-            Work response dict or None
+            List of work dicts ({task_id, log_data}), possibly empty, or None on error
         """
         try:
-            request_data = {
-                "analyzer_id": self.analyzer_id,
-                "weight": self.weight,
-                "current_tasks": len(self.active_tasks)
-            }
+            request_data = self._work_request
+            request_data["current_tasks"] = self._active_count
+            request_data["max_tasks"] = max_tasks
             
             response = await self.client.post(
-                f"{self.distributor_url}/get_work",
-                json=request_data
+                f"{self.distributor_url}/get_work_batch",
+                content=orjson.dumps(request_data),
+                headers=_JSON_HEADERS,
+                timeout=request_data["wait_seconds"] + 10.0
             )
             
             if response.status_code == 200:
-                return response.json()
+                work = orjson.loads(response.content)
+                if "queue_depth" in work:
+                    self.last_queue_depth = work["queue_depth"]
+                    self.last_queue_depth_time = time.monotonic()
+                if "tasks" in work:
+                    return work["tasks"]
+                # Single-task response: treat it as a batch of one
+                if work.get("has_work"):
+                    return [{"task_id": work["task_id"], "log_data": work["log_data"]}]
+                return []
             else:
                 logger.warning(f"Failed to get work: {response.status_code}")
                 return None
@@ -188,9 +350,10 @@ class Analyzer:
             log_data: Log message data
         """
         try:
-            self.logger.debug(
-                f"Processing task {task_id}: {log_data.get('message', '')[:50]}"
-            )
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(
+                    f"Processing task {task_id}: {log_data.get('message', '')[:50]}"
+                )
             
             # Send initial heartbeat
             await self._send_status(task_id, "in_progress")
@@ -210,7 +373,8 @@ class Analyzer:
             await self._send_status(task_id, "completed")
             
             self.total_tasks_processed += 1
-            self.logger.debug(f"Completed task {task_id}")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug(f"Completed task {task_id}")
             
         except Exception as e:
             self.logger.error(f"Error processing task {task_id}: {e}")
@@ -218,11 +382,6 @@ class Analyzer:
             # Mark as failed
             await self._send_status(task_id, "failed", str(e))
             self.total_tasks_failed += 1
-        
-        finally:
-            # Remove from tracking
-            if task_id in self.current_task_ids:
-                self.current_task_ids.remove(task_id)
     
     async def _send_status(
         self,
@@ -231,44 +390,109 @@ class Analyzer:
         message: Optional[str] = None
     ):
         """
-        Send status update to distributor (serves as heartbeat).
+        Queue a status update for the distributor (serves as heartbeat).
+        
+        Updates are sent in batches by _status_flusher.
         
         Args:
             task_id: ID of the task
             status: Status (in_progress, completed, failed)
             message: Optional message
         """
-        try:
-            status_data = {
-                "task_id": task_id,
-                "analyzer_id": self.analyzer_id,
-                "status": status,
-                "timestamp": datetime.utcnow().isoformat(),
-                "message": message
-            }
+        status_data = {
+            "task_id": task_id,
+            "analyzer_id": self.analyzer_id,
+            "status": status,
+            "timestamp": time.time(),  # Epoch seconds (parsed by the distributor)
+            "message": message
+        }
+        
+        self._status_queue.put_nowait(status_data)
+    
+    async def _status_flusher(self):
+        """
+        Send queued status updates to the distributor in batches.
+        
+        Waits status_flush_interval after the first update of a batch so
+        that updates arriving close together (e.g. in_progress followed by
+        completed for a short task) share one message.
+        """
+        while True:
+            batch = [await self._status_queue.get()]
+            await asyncio.sleep(self.status_flush_interval)
+            
+            while len(batch) < self.status_batch_size and not self._status_queue.empty():
+                batch.append(self._status_queue.get_nowait())
             
+            try:
+                await self._deliver_status(batch)
+            finally:
+                for _ in batch:
+                    self._status_queue.task_done()
+    
+    async def _deliver_status(self, batch: List[dict]):
+        """
+        Send a batch of status updates and wait for the distributor's ack.
+        
+        Uses the persistent /ws/status connection when possible, otherwise
+        POST /status_batch.
+        
+        Args:
+            batch: Status updates, in order
+        """
+        body = orjson.dumps(batch)
+        
+        if self._status_ws is None and self._status_ws_enabled:
+            try:
+                self._status_ws = await _ws_connect(self._status_ws_url)
+            except Exception as e:
+                # Don't retry the handshake for every batch
+                self._status_ws_enabled = False
+                self.logger.warning(
+                    f"Status WebSocket unavailable, using HTTP instead: {e}"
+                )
+        
+        if self._status_ws is not None:
+            try:
+                await self._status_ws.send(body)
+                await asyncio.wait_for(self._status_ws.recv(), 10.0)
+                return
+            except Exception as e:
+                # Reconnect on the next batch; send this one over HTTP
+                self.logger.warning(f"Status WebSocket failed, reconnecting: {e}")
+                await self._close_status_ws()
+        
+        try:
             response = await self.client.post(
-                f"{self.distributor_url}/status",
-                json=status_data
+                f"{self.distributor_url}/status_batch",
+                content=body,
+                headers=_JSON_HEADERS
             )
             
             if response.status_code != 200:
                 self.logger.warning(
-                    f"Failed to send status for {task_id}: {response.status_code}"
+                    f"Failed to send {len(batch)} status updates: {response.status_code}"
                 )
                 
         except Exception as e:
             self.logger.error(f"Error sending status: {e}")
     
-    async def _cleanup_completed_tasks(self):
-        """Clean up completed tasks from active_tasks dict."""
-        completed = [
-            task_id for task_id, task in self.active_tasks.items()
-            if task.done()
-        ]
-        
-        for task_id in completed:
-            del self.active_tasks[task_id]
+    async def _close_status_ws(self):
+        """Close the status WebSocket, if open."""
+        ws, self._status_ws = self._status_ws, None
+        if ws is not None:
+            try:
+                await ws.close()
+            except Exception:
+                pass
+    
+    def _on_task_done(self, task_id: str, task: asyncio.Task):
+        """Remove a finished task from active_tasks (done callback)."""
+        self.active_tasks.pop(task_id, None)
+        self._active_count -= 1
+        self._slot_available.set()
+        if self._active_count == 0 and self.on_idle is not None:
+            self.on_idle(self)
     
     def get_stats(self) -> dict:
         """Get analyzer statistics."""
@@ -323,7 +547,9 @@ class AnalyzerPool:
         scale_check_interval: float = 10.0,
         scale_cooldown: float = 30.0,
         scale_up_count: int = 1,
-        scale_down_count: int = 1
+        scale_down_count: int = 1,
+        queue_depth_short_alpha: float = 0.3,
+        queue_depth_long_alpha: float = 0.05
     ):
         """2025-11-09 22:58:40,369 - [__main__] -   Total Emitted: 5537
 2025-11-09 22:58:40,369 - [__main__] - 
@@ -364,6 +590,8 @@ Analyzers:
             scale_cooldown: Minimum seconds between scaling actions
             scale_up_count: Number of analyzers to add per scale up
             scale_down_count: Number of analyzers to remove per scale down
+            queue_depth_short_alpha: Smoothing factor of the fast queue depth EWMA
+            queue_depth_long_alpha: Smoothing factor of the slow queue depth EWMA
         """
         self.distributor_url = distributor_url
         self.num_analyzers = num_analyzers
@@ -384,24 +612,51 @@ Analyzers:
         self.scale_cooldown = scale_cooldown
         self.scale_up_count = scale_up_count
         self.scale_down_count = scale_down_count
+        self.queue_depth_short_alpha = queue_depth_short_alpha
+        self.queue_depth_long_alpha = queue_depth_long_alpha
         
         # Weight for scaled analyzers (high concurrency)
         self.scale_weight = 0.5  # Aggressive: 5 concurrent tasks per scaled analyzer
         
         # Autoscaling state
-        self.last_scale_time: Optional[datetime] = None
+        self.last_scale_time: Optional[float] = None  # time.monotonic()
         self.total_scale_ups = 0
         self.total_scale_downs = 0
         self.autoscale_task: Optional[asyncio.Task] = None
         
+        # Smoothed queue depth (None until the first autoscaling check)
+        self.queue_depth_short_ewma: Optional[float] = None
+        self.queue_depth_long_ewma: Optional[float] = None
+        
+        # Queue depth is normally read from the analyzers' work responses;
+        # /stats is still polled at least this often as a sanity check
+        self.queue_depth_check_interval = 60.0
+        self.last_queue_depth_check = 0.0
+        
         # Stats from scaled-down analyzers (so they're not lost)
         self.scaled_down_processed = 0
         self.scaled_down_failed = 0
         
+        # Set (and replaced) whenever an analyzer becomes idle, so
+        # wait_for_idle() re-checks on transitions instead of polling
+        self._analyzer_idle = asyncio.Event()
+        
+        # Drain tasks of scaled-down analyzers still finishing their work
+        # (joined in stop())
+        self._inflight: set[asyncio.Task] = set()
+        
+        # Last get_stats() result and when it was taken (see get_stats_cached)
+        self._stats_cache: Optional[dict] = None
+        self._stats_cache_time = 0.0
+        
         # Analyzer instances
-        self.analyzers: List[Analyzer] = []
+        self.analyzers: Deque[Analyzer] = deque()
         self.running = False
         
+        # HTTP client shared by all analyzers (created in start()), so warm
+        # connections survive scale-up/scale-down events
+        self.shared_client: Optional[httpx.AsyncClient] = None
+        
         log_msg = f"AnalyzerPool initialized: {num_analyzers} analyzers, weights={self.weights}"
         if enable_autoscaling:
             log_msg += f", autoscaling enabled (min={self.min_size}, max={self.max_size})"
@@ -425,10 +680,7 @@ Analyzers:
         if weights is None:
             # Default pattern: cycle through [0.4, 0.3, 0.2, 0.1]
             default_pattern = [0.4, 0.3, 0.2, 0.1]
-            return [
-                default_pattern[i % len(default_pattern)]
-                for i in range(num_analyzers)
-            ]
+            return list(itertools.islice(itertools.cycle(default_pattern), num_analyzers))
         elif isinstance(weights, (int, float)):
             # Single weight for all analyzers
             return [float(weights)] * num_analyzers
@@ -436,10 +688,7 @@ Analyzers:
             # List of weights
             if len(weights) < num_analyzers:
                 # Cycle through provided weights
-                return [
-                    weights[i % len(weights)]
-                    for i in range(num_analyzers)
-                ]
+                return list(itertools.islice(itertools.cycle(weights), num_analyzers))
             else:
                 # Use first N weights
                 return weights[:num_analyzers]
@@ -454,24 +703,38 @@ Analyzers:
         
         self.running = True
         
-        # Create and start all analyzers
-        for i in range(self.num_analyzers):
-            analyzer_id = f"{self.analyzer_prefix}-{i+1}"
-            weight = self.weights[i]
-            
-            analyzer = Analyzer(
-                analyzer_id=analyzer_id,
+        # One keep-alive pool for the whole pool: each analyzer keeps at most
+        # one work request plus one status update per task in flight
+        peak_weight = max(self.weights + [self.scale_weight])
+        peak_connections = self.max_size * (_weight_to_concurrency(peak_weight) + 1)
+        self.shared_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_keepalive_connections=max(20, peak_connections),
+                max_connections=peak_connections * 2
+            )
+        )
+        
+        # Create all analyzers, then start them concurrently
+        new_analyzers = [
+            Analyzer(
+                analyzer_id=f"{self.analyzer_prefix}-{i+1}",
                 distributor_url=self.distributor_url,
-                weight=weight,
+                weight=self.weights[i],
                 processing_delay=self.processing_delay,
-                poll_interval=self.poll_interval
+                poll_interval=self.poll_interval,
+                client=self.shared_client,
+                on_idle=self._on_analyzer_idle
             )
-            
-            await analyzer.start()
-            self.analyzers.append(analyzer)
-            
+            for i in range(self.num_analyzers)
+        ]
+        
+        await asyncio.gather(*(analyzer.start() for analyzer in new_analyzers))
+        self.analyzers.extend(new_analyzers)
+        
+        for analyzer in new_analyzers:
             logger.info(
-                f"Started {analyzer_id} with weight {weight} "
+                f"Started {analyzer.analyzer_id} with weight {analyzer.weight} "
                 f"(max concurrent: {analyzer.max_concurrent_tasks})"
             )
         
@@ -486,7 +749,12 @@ Analyzers:
             )
     
     async def stop(self):
-        """Stop autoscaling and all analyzers."""
+        """
+        Stop autoscaling and all analyzers.
+        
+        Returns once every analyzer (including scaled-down ones still
+        draining) has finished its tasks and sent its final status updates.
+        """
         if not self.running:
             return
         
@@ -503,16 +771,32 @@ Analyzers:
         
         logger.info(f"Stopping {len(self.analyzers)} analyzers...")
         
-        # Stop all analyzers concurrently
-        await asyncio.gather(
-            *[analyzer.stop() for analyzer in self.analyzers],
-            return_exceptions=True
-        )
+        # Stop all analyzers concurrently (bounded)
+        semaphore = asyncio.Semaphore(_STOP_CONCURRENCY)
+        async with asyncio.TaskGroup() as tg:
+            for analyzer in self.analyzers:
+                tg.create_task(self._stop_analyzer(analyzer, semaphore))
+        
+        # Let scaled-down analyzers finish their remaining tasks
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
         
         logger.info("All analyzers stopped")
         
         # Clear state
         self.analyzers.clear()
+        
+        if self.shared_client:
+            await self.shared_client.aclose()
+            self.shared_client = None
+    
+    async def _stop_analyzer(self, analyzer: Analyzer, semaphore: asyncio.Semaphore):
+        """Stop one analyzer during pool shutdown, logging (not raising) errors."""
+        async with semaphore:
+            try:
+                await analyzer.stop()
+            except Exception as e:
+                logger.error(f"Error stopping {analyzer.analyzer_id}: {e}")
     
     async def scale_up(self, count: int = 1, weight: Optional[float] = None):
         """
@@ -532,26 +816,30 @@ Analyzers:
         
         current_count = len(self.analyzers)
         
-        for i in range(count):
-            analyzer_id = f"{self.analyzer_prefix}-{current_count + i + 1}"
-            
-            analyzer = Analyzer(
-                analyzer_id=analyzer_id,
+        # Create all new analyzers, then start them concurrently
+        new_analyzers = [
+            Analyzer(
+                analyzer_id=f"{self.analyzer_prefix}-{current_count + i + 1}",
                 distributor_url=self.distributor_url,
                 weight=weight,
                 processing_delay=self.processing_delay,
-                poll_interval=self.poll_interval
+                poll_interval=self.poll_interval,
+                client=self.shared_client,
+                on_idle=self._on_analyzer_idle
             )
-            
-            await analyzer.start()
-            self.analyzers.append(analyzer)
-            
+            for i in range(count)
+        ]
+        
+        await asyncio.gather(*(analyzer.start() for analyzer in new_analyzers))
+        self.analyzers.extend(new_analyzers)
+        
+        for analyzer in new_analyzers:
             logger.info(
-                f"🚀 Scaled up: {analyzer_id} with weight {weight} "
+                f"🚀 Scaled up: {analyzer.analyzer_id} with weight {weight} "
                 f"(max concurrent: {analyzer.max_concurrent_tasks})"
             )
         
-        logger.info(f"🚀 Scaled up by {count}. Total analyzers: {len(self.analyzers)} (added {count * int(weight * 10)} total capacity)")
+        logger.info(f"🚀 Scaled up by {count}. Total analyzers: {len(self.analyzers)} (added {count * _weight_to_concurrency(weight)} total capacity)")
     
     async def scale_down(self, count: int = 1):
         """
@@ -571,43 +859,75 @@ Analyzers:
         # Don't remove more than we have
         actual_count = min(count, len(self.analyzers))
         
-        # Stop the last N analyzers
-        to_remove = self.analyzers[-actual_count:]
+        # Stop the last N analyzers (popped off the end, no list copies)
+        to_remove = [self.analyzers.pop() for _ in range(actual_count)]
         
         logger.info(f"Scaling down by {actual_count}...")
         
-        # Capture stats from analyzers being removed BEFORE stopping them
-        for analyzer in to_remove:
-            stats = analyzer.get_stats()
-            self.scaled_down_processed += stats['total_processed']
-            self.scaled_down_failed += stats['total_failed']
-            logger.debug(f"  Captured stats from {analyzer.analyzer_id}: {stats['total_processed']} processed")
-        
-        await asyncio.gather(
-            *[analyzer.stop() for analyzer in to_remove],
-            return_exceptions=True
+        # Stop pulling work right away; remaining tasks drain in the
+        # background and stats are captured once each drain finishes
+        drains = await asyncio.gather(
+            *[analyzer.stop(wait_for_tasks=False) for analyzer in to_remove]
         )
-        
-        # Remove from list
-        self.analyzers = self.analyzers[:-actual_count]
+        for analyzer, drain in zip(to_remove, drains):
+            self._inflight.add(drain)
+            drain.add_done_callback(
+                functools.partial(self._on_analyzer_drained, analyzer)
+            )
         
         logger.info(f"Scaled down by {actual_count}. Total analyzers: {len(self.analyzers)}")
     
+    def _on_analyzer_idle(self, analyzer: Analyzer):
+        """Wake wait_for_idle() callers (analyzer callback)."""
+        # Swap in a fresh event so woken waiters can wait again without a
+        # clear() racing with other waiters
+        self._analyzer_idle.set()
+        self._analyzer_idle = asyncio.Event()
+    
+    def _on_analyzer_drained(self, analyzer: Analyzer, drain: asyncio.Task):
+        """Record a scaled-down analyzer's final stats (done callback)."""
+        self._inflight.discard(drain)
+        stats = analyzer.get_stats()
+        self.scaled_down_processed += stats['total_processed']
+        self.scaled_down_failed += stats['total_failed']
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"  Captured stats from {analyzer.analyzer_id}: {stats['total_processed']} processed")
+    
     def get_current_size(self) -> int:
         """Get the current number of analyzers in the pool."""
         return len(self.analyzers)
     
     async def _get_queue_depth(self) -> int:
-        """Get current queue depth from distributor."""
+        """
+        Get current queue depth from distributor.
+        
+        Uses the freshest depth reported alongside the analyzers' work
+        responses, and only falls back to GET /stats when that reading is
+        older than scale_check_interval or the periodic check is due.
+        """
+        now = time.monotonic()
+        freshest = max(
+            self.analyzers,
+            key=lambda a: a.last_queue_depth_time,
+            default=None
+        )
+        if (
+            freshest is not None
+            and freshest.last_queue_depth is not None
+            and now - freshest.last_queue_depth_time <= self.scale_check_interval
+            and now - self.last_queue_depth_check < self.queue_depth_check_interval
+        ):
+            return freshest.last_queue_depth
+        
+        self.last_queue_depth_check = now
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(
-                    f"{self.distributor_url}/stats",
-                    timeout=2.0
-                )
-                if response.status_code == 200:
-                    stats = response.json()
-                    return stats.get('queue_depth', 0)
+            response = await self.shared_client.get(
+                f"{self.distributor_url}/stats",
+                timeout=2.0
+            )
+            if response.status_code == 200:
+                stats = orjson.loads(response.content)
+                return stats.get('queue_depth', 0)
         except Exception as e:
             logger.debug(f"Failed to get queue depth: {e}")
         return 0
@@ -632,24 +952,43 @@ Analyzers:
         queue_depth = await self._get_queue_depth()
         current_size = self.get_current_size()
         
+        # Smooth the queue depth over a short and a long window (updated on
+        # every check, including during cooldown) so a momentary spike or
+        # dip doesn't trigger scaling on its own
+        if self.queue_depth_short_ewma is None:
+            self.queue_depth_short_ewma = float(queue_depth)
+            self.queue_depth_long_ewma = float(queue_depth)
+        else:
+            self.queue_depth_short_ewma += self.queue_depth_short_alpha * (
+                queue_depth - self.queue_depth_short_ewma
+            )
+            self.queue_depth_long_ewma += self.queue_depth_long_alpha * (
+                queue_depth - self.queue_depth_long_ewma
+            )
+        short_ewma = self.queue_depth_short_ewma
+        long_ewma = self.queue_depth_long_ewma
+        
         # Check if we're in cooldown
-        if self.last_scale_time:
-            from datetime import datetime
-            time_since_scale = (datetime.utcnow() - self.last_scale_time).total_seconds()
+        if self.last_scale_time is not None:
+            time_since_scale = time.monotonic() - self.last_scale_time
             if time_since_scale < self.scale_cooldown:
-                logger.debug(
-                    f"In cooldown: {time_since_scale:.1f}s / {self.scale_cooldown}s"
-                )
+                if logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(
+                        f"In cooldown: {time_since_scale:.1f}s / {self.scale_cooldown}s"
+                    )
                 return
         
-        # Decide on scaling action
+        # Decide on scaling action (both windows must agree; the long window
+        # uses a looser threshold so sustained load reacts reasonably fast)
         should_scale_up = (
-            queue_depth >= self.scale_up_threshold and 
+            short_ewma >= self.scale_up_threshold and
+            long_ewma >= self.scale_up_threshold * 0.6 and
             current_size < self.max_size
         )
         
         should_scale_down = (
-            queue_depth <= self.scale_down_threshold and 
+            short_ewma <= self.scale_down_threshold and
+            long_ewma <= self.scale_down_threshold * 1.5 and
             current_size > self.min_size
         )
         
@@ -658,14 +997,14 @@ Analyzers:
             count = min(self.scale_up_count, self.max_size - current_size)
             
             logger.info(
-                f"🔼 SCALING UP: queue_depth={queue_depth}, "
+                f"🔼 SCALING UP: queue_depth={queue_depth} "
+                f"(ewma short={short_ewma:.1f}, long={long_ewma:.1f}), "
                 f"current_size={current_size}, adding={count} high-capacity analyzers"
             )
             
             # Use aggressive weight for scaled analyzers
             await self.scale_up(count=count, weight=self.scale_weight)
-            from datetime import datetime
-            self.last_scale_time = datetime.utcnow()
+            self.last_scale_time = time.monotonic()
             self.total_scale_ups += 1
         
         elif should_scale_down:
@@ -673,20 +1012,22 @@ Analyzers:
             count = min(self.scale_down_count, current_size - self.min_size)
             
             logger.info(
-                f"🔽 SCALING DOWN: queue_depth={queue_depth}, "
+                f"🔽 SCALING DOWN: queue_depth={queue_depth} "
+                f"(ewma short={short_ewma:.1f}, long={long_ewma:.1f}), "
                 f"current_size={current_size}, removing={count}"
             )
             
             await self.scale_down(count=count)
-            from datetime import datetime
-            self.last_scale_time = datetime.utcnow()
+            self.last_scale_time = time.monotonic()
             self.total_scale_downs += 1
         
         else:
-            logger.debug(
-                f"No scaling needed: queue_depth={queue_depth}, "
-                f"size={current_size}/{self.min_size}-{self.max_size}"
-            )
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    f"No scaling needed: queue_depth={queue_depth} "
+                    f"(ewma short={short_ewma:.1f}, long={long_ewma:.1f}), "
+                    f"size={current_size}/{self.min_size}-{self.max_size}"
+                )
     
     def get_stats(self) -> dict:
         """
@@ -731,21 +1072,50 @@ Analyzers:
         
         # Add autoscaling stats if enabled
         if self.enable_autoscaling:
-            from datetime import datetime
             stats['autoscaling'] = {
                 'enabled': True,
                 'min_size': self.min_size,
                 'max_size': self.max_size,
                 'total_scale_ups': self.total_scale_ups,
                 'total_scale_downs': self.total_scale_downs,
+                'queue_depth_short_ewma': self.queue_depth_short_ewma,
+                'queue_depth_long_ewma': self.queue_depth_long_ewma,
                 'in_cooldown': (
-                    (datetime.utcnow() - self.last_scale_time).total_seconds() < self.scale_cooldown
-                    if self.last_scale_time else False
+                    time.monotonic() - self.last_scale_time < self.scale_cooldown
+                    if self.last_scale_time is not None else False
                 )
             }
         
         return stats
     
+    def get_stats_cached(self, max_age: float = 1.0) -> dict:
+        """
+        Get pool statistics, reusing the previous result if it is recent.
+        
+        The returned dict is shared between callers and must not be modified.
+        
+        Args:
+            max_age: Maximum age in seconds of a reused result
+            
+        Returns:
+            Same as get_stats()
+        """
+        now = time.monotonic()
+        if self._stats_cache is None or now - self._stats_cache_time > max_age:
+            self._stats_cache = self.get_stats()
+            self._stats_cache_time = now
+        return self._stats_cache
+    
+    def _iter_counts(self) -> Iterator[Tuple[str, float, int, int]]:
+        """Yield (analyzer_id, weight, processed, failed) for each current analyzer."""
+        for analyzer in self.analyzers:
+            yield (
+                analyzer.analyzer_id,
+                analyzer.weight,
+                analyzer.total_tasks_processed,
+                analyzer.total_tasks_failed
+            )
+    
     def get_distribution(self) -> dict:
         """
         Get distribution statistics showing how work is distributed.
@@ -753,8 +1123,12 @@ Analyzers:
         Returns:
             Dict with distribution percentages and expected vs actual
         """
-        stats = self.get_stats()
-        total_processed = stats['total_processed']
+        # Same set as get_stats(): current analyzers plus scaled-down totals
+        counts = list(self._iter_counts())
+        total_processed = (
+            sum(processed for _, _, processed, _ in counts)
+            + self.scaled_down_processed
+        )
         
         if total_processed == 0:
             return {
@@ -763,10 +1137,7 @@ Analyzers:
             }
         
         distribution = {}
-        for analyzer_id, astats in stats['analyzer_stats'].items():
-            processed = astats['total_processed']
-            weight = astats['weight']
-            
+        for analyzer_id, weight, processed, _ in counts:
             actual_percentage = (processed / total_processed) * 100
             expected_percentage = weight * 100
             deviation = actual_percentage - expected_percentage
@@ -807,29 +1178,36 @@ Analyzers:
         """
         Wait until all analyzers are idle (no active tasks).
         
+        Re-checks whenever an analyzer reports becoming idle, and at least
+        every check_interval seconds (e.g. if a busy analyzer is removed
+        from the pool).
+        
         Args:
             timeout: Maximum time to wait in seconds
-            check_interval: How often to check in seconds
+            check_interval: Maximum time between checks in seconds
             
         Returns:
             True if idle, False if timeout
         """
-        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
         
-        while time.time() - start_time < timeout:
-            stats = self.get_stats()
-            
-            # Check if all analyzers have no active tasks
-            all_idle = all(
-                astats['active_tasks'] == 0
-                for astats in stats['analyzer_stats'].values()
-            )
-            
-            if all_idle:
+        while True:
+            # Check active tasks directly rather than building full pool stats
+            if all(len(a.active_tasks) == 0 for a in self.analyzers):
                 logger.info("All analyzers are idle")
                 return True
             
-            await asyncio.sleep(check_interval)
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            
+            try:
+                await asyncio.wait_for(
+                    self._analyzer_idle.wait(), min(remaining, check_interval)
+                )
+            except asyncio.TimeoutError:
+                pass
         
         logger.warning(f"Timeout waiting for analyzers to become idle after {timeout}s")
         return False
@@ -0,0 +1,142 @@
+"""
+Distributor client helpers shared by the demo scripts.
+
+All helpers use one HTTP client, opened and closed by shared_client().
+"""
+import asyncio
+import logging
+import httpx
+import msgpack
+import orjson
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+from analyzer import install_uvloop
+
+__all__ = [
+    "shared_client",
+    "check_and_reset",
+    "get_distributor_stats",
+    "wait_for_drain",
+    "install_uvloop",
+]
+
+logger = logging.getLogger(__name__)
+
+# HTTP client shared by all distributor polls (see shared_client())
+_client: Optional[httpx.AsyncClient] = None
+
+
+@asynccontextmanager
+async def shared_client() -> AsyncIterator[httpx.AsyncClient]:
+    """Open the HTTP client used by the helpers below for the duration of a demo."""
+    global _client
+    # The demos poll every 5-10s, longer than httpx's default 5s keep-alive
+    # expiry; keep idle connections long enough to be reused between polls
+    _client = httpx.AsyncClient(
+        timeout=5.0,
+        limits=httpx.Limits(max_keepalive_connections=5, keepalive_expiry=30.0)
+    )
+    try:
+        yield _client
+    finally:
+        await _client.aclose()
+        _client = None
+
+
+async def check_and_reset(url: str) -> bool:
+    """
+    Check the distributor is healthy and reset its statistics for clean metrics.
+    
+    Both requests are sent at once on the shared client.
+    
+    Args:
+        url: Distributor URL
+    
+    Returns:
+        True if the distributor is reachable and healthy
+    """
+    logger.info("Resetting distributor statistics...")
+    try:
+        health, reset = await asyncio.gather(
+            _client.get(f"{url}/health", timeout=2.0),
+            _client.post(f"{url}/reset", timeout=2.0)
+        )
+    except Exception:
+        logger.error(f"Cannot connect to distributor at {url}")
+        logger.error("Please start the distributor first: python run_distributor.py")
+        return False
+    
+    if health.status_code != 200:
+        logger.error("Distributor is not healthy!")
+        return False
+    
+    if reset.status_code == 200:
+        logger.info("✓ Distributor statistics reset")
+    
+    return True
+
+
+async def get_distributor_stats(url: str) -> dict:
+    """Get statistics from distributor."""
+    try:
+        response = await _client.get(
+            f"{url}/stats", params={"fmt": "msgpack"}, timeout=5.0
+        )
+        if response.status_code == 200:
+            return msgpack.unpackb(response.content)
+    except Exception as e:
+        logger.error(f"Failed to get distributor stats: {e}")
+    return {}
+
+
+async def wait_for_drain(url: str, timeout: float, progress_interval: float = 5.0) -> Optional[float]:
+    """
+    Wait until the distributor has no queued or in-progress tasks.
+    
+    Follows the distributor's /events stream (pushed on every state change)
+    instead of polling /stats.
+    
+    Args:
+        url: Distributor URL
+        timeout: Maximum seconds to wait
+        progress_interval: Seconds between progress log lines
+    
+    Returns:
+        Seconds taken to drain, or None if not drained within timeout
+    """
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    next_progress = start + progress_interval
+    
+    async def watch() -> Optional[float]:
+        nonlocal next_progress
+        async with _client.stream(
+            "GET", f"{url}/events", timeout=httpx.Timeout(5.0, read=None)
+        ) as response:
+            async for line in response.aiter_lines():
+                if not line.startswith("data: "):
+                    continue
+                
+                stats = orjson.loads(line[len("data: "):])
+                queue_depth = stats.get('queue_depth', 0)
+                in_progress = stats.get('in_progress', 0)
+                
+                if queue_depth == 0 and in_progress == 0:
+                    return loop.time() - start
+                
+                if loop.time() >= next_progress:
+                    logger.info(
+                        "   [%.0fs] Queue: %s, In-progress: %s",
+                        loop.time() - start, queue_depth, in_progress
+                    )
+                    next_progress += progress_interval
+        return None
+    
+    try:
+        return await asyncio.wait_for(watch(), timeout)
+    except asyncio.TimeoutError:
+        return None
+    except httpx.HTTPError as e:
+        logger.error(f"Failed to watch distributor events: {e}")
+        return None
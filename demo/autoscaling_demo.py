@@ -10,7 +10,6 @@ This demo demonstrates:
 import asyncio
 import logging
 import sys
-import httpx
 from pathlib import Path
 
 # Add parent directory to path
@@ -18,6 +17,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from analyzer import AnalyzerPool
 from emitter import LogEmitterPool
+from demo._client import (
+    shared_client, check_and_reset, get_distributor_stats,
+    wait_for_drain, install_uvloop
+)
 
 # Configure logging
 logging.basicConfig(
@@ -33,31 +36,7 @@ logging.getLogger("uvicorn").setLevel(logging.WARNING)
 logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
 
-async def get_queue_depth(url: str) -> int:
-    """Get current queue depth from distributor."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{url}/stats", timeout=2.0)
-            if response.status_code == 200:
-                stats = response.json()
-                return stats.get('queue_depth', 0)
-    except:
-        return 0
-
-
-async def get_distributor_stats(url: str) -> dict:
-    """Get statistics from distributor."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{url}/stats", timeout=5.0)
-            if response.status_code == 200:
-                return response.json()
-    except Exception as e:
-        logger.error(f"Failed to get distributor stats: {e}")
-    return {}
-
-
-async def main():
+async def _run_demo():
     """Run the autoscaling demo."""
     distributor_url = "http://localhost:8000"
     
@@ -65,23 +44,8 @@ async def main():
     logger.info("AUTOSCALING DEMO - Adaptive Capacity Management")
     logger.info("="*70)
     
-    # Check distributor is running
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{distributor_url}/health", timeout=2.0)
-            if response.status_code != 200:
-                logger.error("Distributor is not healthy!")
-                return
-            
-            # Reset distributor statistics for clean metrics
-            logger.info("Resetting distributor statistics...")
-            response = await client.post(f"{distributor_url}/reset", timeout=2.0)
-            if response.status_code == 200:
-                logger.info("✓ Distributor statistics reset")
-            
-    except Exception:
-        logger.error(f"Cannot connect to distributor at {distributor_url}")
-        logger.error("Please start the distributor first: python run_distributor.py")
+    # Check distributor is running and reset its statistics for clean metrics
+    if not await check_and_reset(distributor_url):
         return
     
     logger.info("✓ Connected to distributor\n")
@@ -105,7 +69,9 @@ async def main():
         scale_check_interval=5.0,   # Check every 5 seconds
         scale_cooldown=15.0,        # Wait 15s between scaling actions
         scale_up_count=2,           # Add 2 high-capacity analyzers at a time
-        scale_down_count=1          # Remove 1 analyzer at a time
+        scale_down_count=1,         # Remove 1 analyzer at a time
+        queue_depth_short_alpha=0.6,  # Smooth queue depth over a few checks...
+        queue_depth_long_alpha=0.3    # ...and a longer window, short enough for this demo
     )
     await analyzer_pool.start()
     logger.info("✓ Analyzer pool started with 2 analyzers\n")
@@ -131,21 +97,22 @@ async def main():
     logger.info("Monitoring autoscaling behavior for 60 seconds...")
     logger.info("(Watch for 🔼 SCALING UP messages)\n")
     
-    for i in range(60):
-        await asyncio.sleep(1)
+    for elapsed in range(10, 61, 10):
+        await asyncio.sleep(10)
         
-        if (i + 1) % 10 == 0:
-            queue_depth = await get_queue_depth(distributor_url)
-            pool_size = analyzer_pool.get_current_size()
-            analyzer_stats = analyzer_pool.get_stats()
-            autoscaling_stats = analyzer_stats.get('autoscaling', {})
-            
-            logger.info(
-                f"[{i+1}s] Queue: {queue_depth}, "
-                f"Analyzers: {pool_size}, "
-                f"Processed: {analyzer_stats['total_processed']}, "
-                f"Scale-ups: {autoscaling_stats.get('total_scale_ups', 0)}"
-            )
+        if not logger.isEnabledFor(logging.INFO):
+            continue
+        
+        queue_depth = (await get_distributor_stats(distributor_url)).get('queue_depth', 0)
+        analyzer_stats = analyzer_pool.get_stats_cached()
+        autoscaling_stats = analyzer_stats.get('autoscaling', {})
+        
+        logger.info(
+            "[%ss] Queue: %s, Analyzers: %s, Processed: %s, Scale-ups: %s",
+            elapsed, queue_depth, analyzer_stats['num_analyzers'],
+            analyzer_stats['total_processed'],
+            autoscaling_stats.get('total_scale_ups', 0)
+        )
     
     # Phase 3: Reduce load
     logger.info("\n" + "="*70)
@@ -160,26 +127,26 @@ async def main():
     logger.info("(Watch for 🔽 SCALING DOWN messages)\n")
     
     queue_drained = False
-    for i in range(90):
-        await asyncio.sleep(1)
+    for elapsed in range(10, 91, 10):
+        await asyncio.sleep(10)
         
-        if (i + 1) % 10 == 0:
-            queue_depth = await get_queue_depth(distributor_url)
-            pool_size = analyzer_pool.get_current_size()
-            analyzer_stats = analyzer_pool.get_stats()
+        queue_depth = (await get_distributor_stats(distributor_url)).get('queue_depth', 0)
+        
+        if logger.isEnabledFor(logging.INFO):
+            analyzer_stats = analyzer_pool.get_stats_cached()
             autoscaling_stats = analyzer_stats.get('autoscaling', {})
             
             logger.info(
-                f"[{i+1}s] Queue: {queue_depth}, "
-                f"Analyzers: {pool_size}, "
-                f"Processed: {analyzer_stats['total_processed']}, "
-                f"Scale-downs: {autoscaling_stats.get('total_scale_downs', 0)}"
+                "[%ss] Queue: %s, Analyzers: %s, Processed: %s, Scale-downs: %s",
+                elapsed, queue_depth, analyzer_stats['num_analyzers'],
+                analyzer_stats['total_processed'],
+                autoscaling_stats.get('total_scale_downs', 0)
             )
-            
-            # Check if queue is drained
-            if queue_depth == 0 and not queue_drained:
-                logger.info(f"\n✓ Queue drained at {i+1} seconds")
-                queue_drained = True
+        
+        # Check if queue is drained
+        if queue_depth == 0 and not queue_drained:
+            logger.info("\n✓ Queue drained at %s seconds", elapsed)
+            queue_drained = True
     
     # Final statistics
     logger.info("\n" + "="*70)
@@ -189,44 +156,25 @@ async def main():
     # Capture emitter stats (already stopped)
     emitter_stats = emitter_pool.get_stats()
     
-    # Give time for in-flight requests to complete
-    logger.info("\nWaiting for in-flight requests and queue to drain...")
-    await asyncio.sleep(2)
+    # Wait for queue to fully drain (emitter_pool.stop() already waited for
+    # every buffered log to be accepted by the distributor)
+    logger.info("\nWaiting for queue to drain...")
+    drain_seconds = await wait_for_drain(distributor_url, timeout=30)
     
-    # Wait for queue to fully drain
-    queue_drained = False
-    for i in range(30):
-        queue_depth = await get_queue_depth(distributor_url)
-        dist_stats = await get_distributor_stats(distributor_url)
-        in_progress = dist_stats.get('in_progress', 0) if dist_stats else 0
-        
-        if queue_depth == 0 and in_progress == 0:
-            logger.info(f"✓ Queue drained after {i+1} seconds")
-            queue_drained = True
-            break
-        
-        if (i + 1) % 5 == 0:
-            logger.info(f"  [{i+1}s] Queue: {queue_depth}, In-progress: {in_progress}")
-        
-        await asyncio.sleep(1)
-    
-    if not queue_drained:
+    if drain_seconds is not None:
+        logger.info(f"✓ Queue drained after {drain_seconds:.1f} seconds")
+    else:
         logger.warning(f"⚠️  Queue did not fully drain")
     
-    # Give final status updates time to reach distributor
-    await asyncio.sleep(2)
-    
     # Capture analyzer stats before stopping
     analyzer_stats = analyzer_pool.get_stats()
     autoscaling_stats = analyzer_stats.get('autoscaling', {})
     
     # Stop analyzers
     logger.info("\nShutting down analyzers...")
+    # (returns once every analyzer's final status updates are acknowledged)
     await analyzer_pool.stop()
     
-    # Give distributor time to process final updates
-    await asyncio.sleep(1)
-    
     # Get final distributor stats
     distributor_stats = await get_distributor_stats(distributor_url)
     
@@ -262,6 +210,13 @@ async def main():
     logger.info("="*70 + "\n")
 
 
+async def main():
+    """Run the autoscaling demo with a shared HTTP client."""
+    async with shared_client():
+        await _run_demo()
+
+
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
 
@@ -10,7 +10,6 @@ This script demonstrates the complete system:
 import asyncio
 import logging
 import sys
-import httpx
 from pathlib import Path
 
 # Add parent directory to path
@@ -18,6 +17,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from analyzer import AnalyzerPool
 from emitter import LogEmitterPool
+from demo._client import (
+    shared_client, check_and_reset, get_distributor_stats,
+    wait_for_drain, install_uvloop
+)
 
 # Configure logging
 logging.basicConfig(
@@ -33,7 +36,7 @@ logging.getLogger("uvicorn").setLevel(logging.WARNING)
 logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
 
-async def main():
+async def _run_demo():
     """Run the demo."""
     distributor_url = "http://localhost:8000"
     
@@ -45,24 +48,8 @@ async def main():
     logger.info("LOGS DISTRIBUTOR DEMO - Pull-Based Work Queue")
     logger.info("="*60)
     
-    # Check distributor is running
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{distributor_url}/health", timeout=2.0)
-            if response.status_code != 200:
-                logger.error("Distributor is not healthy!")
-                return
-            
-            # Reset distributor statistics for clean metrics
-            logger.info("Resetting distributor statistics...")
-            response = await client.post(f"{distributor_url}/reset", timeout=2.0)
-            if response.status_code == 200:
-                logger.info("✓ Distributor statistics reset")
-            
-    except Exception as e:
-        logger.error(f"Cannot connect to distributor at {distributor_url}")
-        logger.error("Please start the distributor first:")
-        logger.error("  python run_distributor.py")
+    # Check distributor is running and reset its statistics for clean metrics
+    if not await check_and_reset(distributor_url):
         return
     
     logger.info(f"✓ Distributor is running at {distributor_url}\n")
@@ -97,26 +84,22 @@ async def main():
         # Monitor while running
         logger.info(f"Running for up to {run_duration_seconds} seconds or {max_logs_cutoff} logs...\n")
         
-        for i in range(run_duration_seconds):
-            await asyncio.sleep(1)
-            
-            # Check cutoffs
-            emitter_stats = emitter_pool.get_stats()
-            analyzer_stats = analyzer_pool.get_stats()
+        for elapsed in range(5, run_duration_seconds + 1, 5):
+            # Sleep until the next progress report, waking early if we hit
+            # the log cutoff
+            if await emitter_pool.wait_for_emitted(max_logs_cutoff, timeout=5):
+                logger.info(f"\n✓ Reached {max_logs_cutoff} logs cutoff")
+                break
             
             # Print progress every 5 seconds
-            if (i + 1) % 5 == 0:
+            if logger.isEnabledFor(logging.INFO):
+                analyzer_stats = analyzer_pool.get_stats_cached()
+                queue_depth = (await get_distributor_stats(distributor_url)).get('queue_depth', 0)
                 logger.info(
-                    f"[{i+1}s] "
-                    f"Emitted: {emitter_stats['total_emitted']}, "
-                    f"Processed: {analyzer_stats['total_processed']}, "
-                    f"Queue: {await get_queue_depth(distributor_url)}"
+                    "[%ss] Emitted: %s, Processed: %s, Queue: %s",
+                    elapsed, emitter_pool.total_emitted,
+                    analyzer_stats['total_processed'], queue_depth
                 )
-            
-            # Check if we hit the log cutoff
-            if emitter_stats['total_emitted'] >= max_logs_cutoff:
-                logger.info(f"\n✓ Reached {max_logs_cutoff} logs cutoff")
-                break
     
     except KeyboardInterrupt:
         logger.info("\n✓ Received interrupt signal")
@@ -127,7 +110,8 @@ async def main():
         logger.info("SHUTTING DOWN")
         logger.info("="*60)
         
-        # Step 1: Stop emitters (no more new logs)
+        # Step 1: Stop emitters (no more new logs). Returns once every
+        # buffered log has been accepted by the distributor.
         logger.info("\n[1/3] Stopping emitter pool...")
         await emitter_pool.stop()
         
@@ -135,34 +119,16 @@ async def main():
         emitter_stats = emitter_pool.get_stats()
         logger.info(f"✓ Emitters stopped (total emitted: {emitter_stats['total_emitted']})")
         
-        # Give a moment for in-flight requests to reach distributor
-        logger.info("   Waiting for in-flight requests to complete...")
-        await asyncio.sleep(2)
-        
         # Step 2: Wait for distributor queue to drain
         logger.info("\n[2/3] Waiting for distributor queue to drain...")
-        queue_drained = False
-        for i in range(60):  # Wait up to 60 seconds
-            queue_depth = await get_queue_depth(distributor_url)
-            in_progress = (await get_distributor_stats(distributor_url)).get('in_progress', 0)
-            
-            if queue_depth == 0 and in_progress == 0:
-                logger.info(f"✓ Queue drained after {i+1} seconds")
-                queue_drained = True
-                break
-            
-            if (i + 1) % 5 == 0:
-                logger.info(f"   [{i+1}s] Queue: {queue_depth}, In-progress: {in_progress}")
-            
-            await asyncio.sleep(1)
+        drain_seconds = await wait_for_drain(distributor_url, timeout=60)
         
-        if not queue_drained:
-            queue_depth = await get_queue_depth(distributor_url)
+        if drain_seconds is not None:
+            logger.info(f"✓ Queue drained after {drain_seconds:.1f} seconds")
+        else:
+            queue_depth = (await get_distributor_stats(distributor_url)).get('queue_depth', 0)
             logger.warning(f"⚠️  Queue did not fully drain (remaining: {queue_depth})")
         
-        # Give a moment for final status updates to reach distributor
-        await asyncio.sleep(2)
-        
         # Step 3: Stop analyzers
         logger.info("\n[3/3] Stopping analyzer pool...")
         
@@ -170,12 +136,10 @@ async def main():
         analyzer_stats = analyzer_pool.get_stats()
         distribution = analyzer_pool.get_distribution()
         
+        # (returns once every analyzer's final status updates are acknowledged)
         await analyzer_pool.stop()
         logger.info("✓ Analyzers stopped")
         
-        # Give distributor a moment to process final updates
-        await asyncio.sleep(1)
-        
         # Output final statistics
         logger.info("\n" + "="*60)
         logger.info("FINAL STATISTICS")
@@ -240,29 +204,12 @@ async def main():
         logger.info("="*60 + "\n")
 
 
-async def get_distributor_stats(url: str) -> dict:
-    """Get statistics from distributor."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{url}/stats", timeout=5.0)
-            if response.status_code == 200:
-                return response.json()
-    except Exception as e:
-        logger.error(f"Failed to get distributor stats: {e}")
-    return {}
-
-
-async def get_queue_depth(url: str) -> int:
-    """Get current queue depth from distributor."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{url}/stats", timeout=2.0)
-            if response.status_code == 200:
-                stats = response.json()
-                return stats.get('queue_depth', 0)
-    except:
-        return 0
+async def main():
+    """Run the demo with a shared HTTP client."""
+    async with shared_client():
+        await _run_demo()
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
@@ -11,7 +11,6 @@ This demo demonstrates:
 import asyncio
 import logging
 import sys
-import httpx
 import random
 from pathlib import Path
 
@@ -20,6 +19,10 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from analyzer import AnalyzerPool
 from emitter import LogEmitterPool
+from demo._client import (
+    shared_client, check_and_reset, get_distributor_stats,
+    wait_for_drain, install_uvloop
+)
 
 # Configure logging
 logging.basicConfig(
@@ -35,30 +38,6 @@ logging.getLogger("uvicorn").setLevel(logging.WARNING)
 logging.getLogger("uvicorn.access").setLevel(logging.WARNING)
 
 
-async def get_queue_depth(url: str) -> int:
-    """Get current queue depth from distributor."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{url}/stats", timeout=2.0)
-            if response.status_code == 200:
-                stats = response.json()
-                return stats.get('queue_depth', 0)
-    except:
-        return 0
-
-
-async def get_distributor_stats(url: str) -> dict:
-    """Get statistics from distributor."""
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{url}/stats", timeout=5.0)
-            if response.status_code == 200:
-                return response.json()
-    except Exception as e:
-        logger.error(f"Failed to get distributor stats: {e}")
-    return {}
-
-
 async def random_failures(analyzer_pool, duration: int, failure_rate: float = 0.3, killed_stats: dict = None):
     """
     Randomly kill analyzers during operation.
@@ -69,18 +48,30 @@ async def random_failures(analyzer_pool, duration: int, failure_rate: float = 0.
         failure_rate: Probability of killing an analyzer per check
         killed_stats: Dictionary to accumulate stats from killed analyzers
     """
-    start_time = asyncio.get_event_loop().time()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + duration
     
-    while asyncio.get_event_loop().time() - start_time < duration:
-        await asyncio.sleep(random.uniform(5, 15))  # Wait 5-15 seconds
+    while True:
+        # Wait 5-15 seconds for the next failure, but never past the deadline
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            break
+        await asyncio.sleep(min(random.uniform(5, 15), remaining))
+        if loop.time() >= deadline:
+            break
         
         if not analyzer_pool.analyzers:
             logger.warning("⚠️  No analyzers left to kill!")
             continue
         
         if random.random() < failure_rate:
-            # Pick a random analyzer to kill
-            victim = random.choice(analyzer_pool.analyzers)
+            # Pick a random analyzer to kill and remove it from the pool
+            # (swap with the last one and pop, instead of a remove() scan)
+            analyzers = analyzer_pool.analyzers
+            index = random.randrange(len(analyzers))
+            victim = analyzers[index]
+            analyzers[index] = analyzers[-1]
+            analyzers.pop()
             analyzer_id = victim.analyzer_id
             
             # Capture stats before killing
@@ -99,15 +90,12 @@ async def random_failures(analyzer_pool, duration: int, failure_rate: float = 0.
             # Stop the analyzer
             await victim.stop()
             
-            # Remove from pool
-            analyzer_pool.analyzers.remove(victim)
-            
             logger.info(
                 f"   Remaining analyzers: {len(analyzer_pool.analyzers)}"
             )
 
 
-async def main():
+async def _run_demo():
     """Run the failure resilience demo."""
     distributor_url = "http://localhost:8000"
     
@@ -115,23 +103,8 @@ async def main():
     logger.info("FAILURE RESILIENCE DEMO - Handling Analyzer Failures")
     logger.info("="*70)
     
-    # Check distributor is running
-    try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{distributor_url}/health", timeout=2.0)
-            if response.status_code != 200:
-                logger.error("Distributor is not healthy!")
-                return
-            
-            # Reset distributor statistics for clean metrics
-            logger.info("Resetting distributor statistics...")
-            response = await client.post(f"{distributor_url}/reset", timeout=2.0)
-            if response.status_code == 200:
-                logger.info("✓ Distributor statistics reset")
-            
-    except Exception:
-        logger.error(f"Cannot connect to distributor at {distributor_url}")
-        logger.error("Please start the distributor first: python run_distributor.py")
+    # Check distributor is running and reset its statistics for clean metrics
+    if not await check_and_reset(distributor_url):
         return
     
     logger.info("✓ Connected to distributor\n")
@@ -182,81 +155,68 @@ async def main():
         'total_failed': 0
     }
     
-    # Track initial stats
-    initial_stats = await get_distributor_stats(distributor_url)
-    initial_received = initial_stats.get('total_received', 0) if initial_stats else 0
-    
-    # Run chaos and monitoring concurrently
-    chaos_task = asyncio.create_task(
-        random_failures(analyzer_pool, duration=60, failure_rate=0.4, killed_stats=killed_stats)
-    )
+    # Monitor progress: one /stats snapshot at each 10s mark, logged only
+    # when it changed
+    last_snapshot = None
     
-    # Monitor progress
-    for i in range(60):
-        await asyncio.sleep(1)
+    async def log_snapshot(elapsed: int):
+        nonlocal last_snapshot
+        dist_stats = await get_distributor_stats(distributor_url)
+        if not dist_stats:
+            return
         
-        if (i + 1) % 10 == 0:
-            queue_depth = await get_queue_depth(distributor_url)
-            pool_size = analyzer_pool.get_current_size()
-            analyzer_stats = analyzer_pool.get_stats()
-            dist_stats = await get_distributor_stats(distributor_url)
-            
-            if dist_stats:
-                logger.info(
-                    f"[{i+1}s] "
-                    f"Analyzers: {pool_size}/6, "
-                    f"Queue: {queue_depth}, "
-                    f"Received: {dist_stats['total_received']}, "
-                    f"Completed: {dist_stats['total_completed']}, "
-                    f"In-Progress: {dist_stats['in_progress']}"
-                )
-    
-    await chaos_task
+        snapshot = (
+            analyzer_pool.get_current_size(), dist_stats['queue_depth'],
+            dist_stats['total_received'], dist_stats['total_completed'],
+            dist_stats['in_progress']
+        )
+        if snapshot == last_snapshot:
+            return
+        last_snapshot = snapshot
+        
+        logger.info(
+            "[%ss] Analyzers: %s/6, Queue: %s, Received: %s, "
+            "Completed: %s, In-Progress: %s",
+            elapsed, *snapshot
+        )
+    
+    async def monitor():
+        for elapsed in range(10, 61, 10):
+            await asyncio.sleep(10)
+            await log_snapshot(elapsed)
+    
+    # Run chaos and monitoring concurrently (if either fails, the other is
+    # cancelled)
+    async with asyncio.TaskGroup() as tg:
+        tg.create_task(random_failures(
+            analyzer_pool, duration=60, failure_rate=0.4, killed_stats=killed_stats
+        ))
+        tg.create_task(monitor())
     
     # Let remaining analyzers finish processing
     logger.info("\n" + "="*70)
     logger.info("PHASE 4: Draining queue with remaining analyzers")
     logger.info("="*70)
     
+    # Returns once every buffered log has been accepted by the distributor
     await emitter_pool.stop()
     logger.info("✓ Emitters stopped\n")
     
-    # Wait for in-flight requests
-    await asyncio.sleep(2)
-    
     # Wait for queue to drain
     logger.info("Waiting for remaining work to complete...")
-    queue_drained = False
-    for i in range(60):
-        queue_depth = await get_queue_depth(distributor_url)
-        dist_stats = await get_distributor_stats(distributor_url)
-        in_progress = dist_stats.get('in_progress', 0) if dist_stats else 0
-        
-        if queue_depth == 0 and in_progress == 0:
-            logger.info(f"✓ Queue drained after {i+1} seconds (all tasks completed)")
-            queue_drained = True
-            break
-        
-        if (i + 1) % 5 == 0:
-            logger.info(f"   [{i+1}s] Queue: {queue_depth}, In-progress: {in_progress}")
-        
-        await asyncio.sleep(1)
+    drain_seconds = await wait_for_drain(distributor_url, timeout=60)
     
-    if not queue_drained:
+    if drain_seconds is not None:
+        logger.info(f"✓ Queue drained after {drain_seconds:.1f} seconds (all tasks completed)")
+    else:
         logger.warning(f"⚠️  Queue did not fully drain in 60 seconds")
     
-    # Extra time for final status updates
-    await asyncio.sleep(2)
-    
     # Final statistics
     logger.info("\n" + "="*70)
     logger.info("FINAL STATISTICS")
     logger.info("="*70)
     
-    # Give time for final updates
-    await asyncio.sleep(2)
-    
-    # Capture emitter stats (already stopped) - do this LATE to get final count
+    # Capture emitter stats (already stopped)
     emitter_stats = emitter_pool.get_stats()
     
     # Capture analyzer stats before stopping
@@ -264,11 +224,9 @@ async def main():
     
     # Stop remaining analyzers
     logger.info("\nShutting down remaining analyzers...")
+    # (returns once every analyzer's final status updates are acknowledged)
     await analyzer_pool.stop()
     
-    # Give distributor time to process final updates
-    await asyncio.sleep(1)
-    
     # Get final distributor stats
     distributor_stats = await get_distributor_stats(distributor_url)
     
@@ -317,6 +275,13 @@ async def main():
     logger.info("="*70 + "\n")
 
 
+async def main():
+    """Run the failure resilience demo with a shared HTTP client."""
+    async with shared_client():
+        await _run_demo()
+
+
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
 
@@ -4,20 +4,29 @@ Distributor: Core work queue and task distribution system.
 The Distributor manages:
 - A queue of pending tasks
 - An in-progress map of tasks being processed
-- A data store for actual log data
+- The log data carried by each task
 - Distribution of work to analyzers (pull model)
 """
 import asyncio
+import heapq
 import logging
+import math
+import msgpack
+import orjson
+import time
 from collections import deque
-from datetime import datetime
-from typing import Dict, Optional, Deque
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from contextlib import aclosing
+from typing import (
+    Dict, Optional, Deque, List, AsyncIterator, Tuple, Type, TypeVar, Callable, Awaitable
+)
+from fastapi import Depends, FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import Response, StreamingResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError
 
 from .models import (
-    LogMessage, Task, TaskStatus, StatusUpdate,
-    WorkRequest, WorkResponse, ScalingMetrics
+    LogMessage, LogBatch, Task, TaskStatus, StatusUpdate,
+    WorkRequest, WorkResponse, WorkItem, WorkBatchResponse, ScalingMetrics
 )
 
 logger = logging.getLogger(__name__)
@@ -34,6 +43,16 @@ class Colors:
     BOLD = '\033[1m'
 
 
+# Colored log labels, built once rather than on every log call
+_DISTRIBUTOR_PREFIX = f"{Colors.BOLD}{Colors.CYAN}[DISTRIBUTOR]{Colors.RESET}"
+_LOG_RECEIVED = f"{Colors.GREEN}RECEIVED LOG{Colors.RESET}"
+_LOG_ASSIGNED = f"{Colors.BLUE}ASSIGNED WORK{Colors.RESET}"
+_LOG_HEARTBEAT = f"{Colors.YELLOW}HEARTBEAT{Colors.RESET}"
+_LOG_HEARTBEATS = f"{Colors.YELLOW}HEARTBEATS{Colors.RESET}"
+_LOG_COMPLETED = f"{Colors.GREEN}TASK COMPLETED{Colors.RESET}"
+_LOG_FAILED = f"{Colors.MAGENTA}TASK FAILED{Colors.RESET}"
+
+
 class ColoredFormatter(logging.Formatter):
     """Custom formatter that adds color to distributor logs."""
     
@@ -42,10 +61,23 @@ class ColoredFormatter(logging.Formatter):
         if record.name.startswith('distributor'):
             original = super().format(record)
             # Wrap the entire log in cyan and bold
-            return f"{Colors.BOLD}{Colors.CYAN}[DISTRIBUTOR]{Colors.RESET} {original}"
+            return f"{_DISTRIBUTOR_PREFIX} {original}"
         return super().format(record)
 
 
+class _Waiter:
+    """An analyzer's long-poll request waiting for work."""
+    
+    def __init__(self, analyzer_id: str, weight: float, max_tasks: int):
+        self.analyzer_id = analyzer_id
+        self.weight = weight
+        self.max_tasks = max_tasks
+        
+        loop = asyncio.get_running_loop()
+        self.future: asyncio.Future = loop.create_future()
+        self.since = loop.time()  # When the wait started (for aging)
+
+
 class Distributor:
     """
     Core distributor that manages work queue and task distribution.
@@ -53,14 +85,16 @@ class Distributor:
     Architecture:
     - Queue: deque of Task objects (FIFO, but priority items go to front)
     - In-Progress Map: Dict[task_id, Task] for active tasks
-    - Data Store: Dict[task_id, LogMessage] for actual log data
+    - Each Task carries its LogMessage until it completes or fails
     """
     
     def __init__(
         self,
         task_timeout_seconds: int = 30,
         backpressure_threshold: int = 100,
-        monitor_interval_seconds: int = 5
+        monitor_interval_seconds: int = 5,
+        aging_interval_seconds: float = 10.0,
+        inflight_per_weight: float = 20.0
     ):
         """
         Initialize the distributor.
@@ -69,35 +103,84 @@ class Distributor:
             task_timeout_seconds: Seconds without heartbeat before task timeout
             backpressure_threshold: Queue depth that triggers scaling
             monitor_interval_seconds: How often to run background monitor
+            aging_interval_seconds: Seconds of waiting that earn a waiting
+                analyzer one unit of virtual time of priority (prevents
+                starvation of low-weight analyzers)
+            inflight_per_weight: Tasks an analyzer may hold at once per unit
+                of weight (at least 1); further requests get no work until
+                some finish
         """
+        # The queue and task collections below need no locks: they are only
+        # touched in blocks that don't await, so each block is atomic on the
+        # event loop.
+        
         # Task queue (FIFO)
         self.queue: Deque[Task] = deque()
         
         # In-progress tasks
         self.in_progress: Dict[str, Task] = {}
         
-        # Completed/failed tasks (for stats)
-        self.completed: Dict[str, Task] = {}
-        self.failed: Dict[str, Task] = {}
+        # Heap of (timeout deadline, task_id), pushed when a task is assigned,
+        # so the timeout check only looks at tasks whose deadline has passed.
+        # Deadlines are time.monotonic() based on the heartbeat at push time;
+        # later heartbeats are picked up when the entry comes due, and
+        # entries for tasks no longer in progress are discarded then.
+        self._deadlines: List[Tuple[float, str]] = []
+        
+        # Most recently completed/failed tasks (bounded; the totals below
+        # count every task)
+        self.recent_completed: Deque[Task] = deque(maxlen=256)
+        self.recent_failed: Deque[Task] = deque(maxlen=256)
         
-        # Data store (actual log data)
-        self.data_store: Dict[str, LogMessage] = {}
+        # Analyzers long-polling for work. New work is handed to them in
+        # weighted-fair order: each analyzer has a virtual time that advances
+        # by tasks/weight per dispatch, and the waiter with the smallest
+        # virtual time is served first.
+        self._waiters: List[_Waiter] = []
+        self._virtual_times: Dict[str, float] = {}
+        self._virtual_clock = 0.0
         
-        # Locks for thread safety
-        self.queue_lock = asyncio.Lock()
-        self.in_progress_lock = asyncio.Lock()
-        self.data_lock = asyncio.Lock()
+        # Tasks currently assigned to each analyzer. An analyzer at its
+        # in-flight limit (weight * inflight_per_weight, from the weight in
+        # its work requests) gets no more work, so a slow analyzer
+        # that happens to poll first can't hoard tasks that faster ones
+        # (which finish and re-poll sooner) would complete earlier.
+        self.analyzer_load: Dict[str, int] = {}
+        
+        # Set (and replaced) whenever queue/in-progress state changes, to wake
+        # /events subscribers; only swapped while someone is watching
+        self._state_changed = asyncio.Event()
+        self._state_watchers = 0
+        
+        # Incremented on every such change, so cached /stats bodies can tell
+        # whether they are still current
+        self.state_version = 0
+        
+        # Last get_metrics() result, the state_version it was built at and
+        # when (loop time); reused while both are current (see get_metrics)
+        self._metrics_cache: Optional[ScalingMetrics] = None
+        self._metrics_cache_version = -1
+        self._metrics_cache_time = 0.0
+        self.metrics_cache_seconds = 0.1
         
         # Configuration
+        self.max_long_poll_seconds = 30.0
         self.task_timeout_seconds = task_timeout_seconds
         self.backpressure_threshold = backpressure_threshold
         self.monitor_interval_seconds = monitor_interval_seconds
+        self.aging_interval_seconds = aging_interval_seconds
+        self.inflight_per_weight = inflight_per_weight
         
         # Statistics
         self.total_tasks_received = 0
         self.total_tasks_completed = 0
         self.total_tasks_failed = 0
         self.total_tasks_requeued = 0
+        self.total_heartbeats = 0
+        
+        # Heartbeats are logged individually only at DEBUG; the background
+        # monitor logs how many arrived since its previous summary
+        self._heartbeats_logged = 0
         
         # Background monitor task
         self.monitor_task: Optional[asyncio.Task] = None
@@ -140,28 +223,62 @@ class Distributor:
         Returns:
             task_id: ID of the created task
         """
-        # Create task
-        task = Task()
-        task.data_key = task.task_id
+        task_ids = await self.submit_log_batch([log])
+        return task_ids[0]
+    
+    async def submit_log_batch(self, logs: List[LogMessage]) -> List[str]:
+        """
+        Submit several log messages at once (called by Emitters).
+        
+        Waiting analyzers are woken once, after every task is queued. The
+        receipt log lines are written on the next loop iteration, after the
+        request has been answered (see _log_received).
+        
+        Args:
+            logs: The log messages to process, queued in order
+            
+        Returns:
+            task_ids: IDs of the created tasks, in the same order
+        """
+        # Create tasks (submitted together, they share one creation time)
+        created_at = time.monotonic()
+        tasks = [Task(log_data=log, created_at=created_at) for log in logs]
         
-        async with self.queue_lock:
-            self.queue.append(task)
-            self.total_tasks_received += 1
+        depth_before = len(self.queue)
+        self.queue.extend(tasks)
+        self.total_tasks_received += len(tasks)
         
-        async with self.data_lock:
-            self.data_store[task.task_id] = log
+        # Log receipt off the emitter's request path. Scheduled before the
+        # dispatch below wakes any waiter, so (callbacks running in FIFO
+        # order) it still precedes the ASSIGNED lines for these tasks.
+        if self.logger.isEnabledFor(logging.INFO):
+            asyncio.get_running_loop().call_soon(
+                self._log_received, tasks, logs, depth_before
+            )
         
-        # Log receipt with metadata
-        self.logger.info(
-            f"{Colors.GREEN}RECEIVED LOG{Colors.RESET} | "
-            f"task={task.task_id[:8]} | "
-            f"source={log.source} | "
-            f"level={log.level} | "
-            f"msg='{log.message[:40]}...' | "
-            f"queue_depth={len(self.queue)}"
-        )
+        self._dispatch_to_waiters()
+        self._notify_state_change()
         
-        return task.task_id
+        return [task.task_id for task in tasks]
+    
+    def _log_received(self, tasks: List[Task], logs: List[LogMessage], depth_before: int):
+        """
+        Log the receipt of newly queued tasks (call_soon callback).
+        
+        Args:
+            tasks: The tasks just queued, in order
+            logs: Their log messages (the tasks may have finished and
+                dropped their data by the time this runs)
+            depth_before: Queue depth before they were queued
+        """
+        # Lazy %-formatting; each line shows the depth once its task was queued
+        for position, (task, log) in enumerate(zip(tasks, logs), depth_before + 1):
+            self.logger.info(
+                "%s | task=%s | source=%s | level=%s | "
+                "msg='%.40s...' | queue_depth=%d",
+                _LOG_RECEIVED, task.task_id, log.source,
+                log.level, log.message, position
+            )
     
     async def get_work(self, request: WorkRequest) -> WorkResponse:
         """
@@ -173,42 +290,31 @@ class Distributor:
         Returns:
             WorkResponse with task and data, or no work available
         """
-        async with self.queue_lock:
-            if not self.queue:
-                return WorkResponse(
-                    has_work=False,
-                    message="Queue is empty"
-                )
-            
-            # Get task from front of queue
-            task = self.queue.popleft()
+        if not self.queue:
+            return WorkResponse(
+                has_work=False,
+                message="Queue is empty"
+            )
         
-        # Move to in-progress
-        task.assign_to_analyzer(request.analyzer_id)
+        if self._inflight_allowance(request.analyzer_id, request.weight) <= 0:
+            return WorkResponse(
+                has_work=False,
+                message="Analyzer at in-flight limit"
+            )
         
-        async with self.in_progress_lock:
-            self.in_progress[task.task_id] = task
+        # Get task from front of queue
+        task = self.queue.popleft()
         
-        # Get the actual data
-        async with self.data_lock:
-            log_data = self.data_store.get(task.task_id)
+        log_data = await self._assign_task(task, request.analyzer_id)
         
         if not log_data:
-            logger.error(f"Data not found for task {task.task_id}")
             return WorkResponse(
                 has_work=False,
                 message="Data not found"
             )
         
-        # Log work assignment with metadata
-        self.logger.info(
-            f"{Colors.BLUE}ASSIGNED WORK{Colors.RESET} | "
-            f"task={task.task_id[:8]} | "
-            f"to={request.analyzer_id} | "
-            f"level={log_data.level} | "
-            f"msg='{log_data.message[:40]}...' | "
-            f"queue_depth={len(self.queue)}"
-        )
+        # Charged like batch takes, so single-task requests stay weighted-fair
+        self._charge(request.analyzer_id, request.weight, 1)
         
         return WorkResponse(
             has_work=True,
@@ -217,6 +323,218 @@ class Distributor:
             message="Work assigned"
         )
     
+    async def get_work_batch(self, request: WorkRequest) -> WorkBatchResponse:
+        """
+        Get up to request.max_tasks tasks for an analyzer in one round-trip.
+        
+        If the queue is empty and request.wait_seconds > 0, the request is
+        held open (long-poll) until work arrives or the wait expires. Work
+        arriving while several analyzers wait is shared between them in
+        proportion to their weights (see _dispatch_to_waiters).
+        
+        Args:
+            request: Work request from analyzer
+            
+        Returns:
+            WorkBatchResponse with the assigned tasks (possibly empty)
+        """
+        allowance = self._inflight_allowance(request.analyzer_id, request.weight)
+        if allowance <= 0:
+            return WorkBatchResponse(
+                has_work=False,
+                message="Analyzer at in-flight limit",
+                queue_depth=len(self.queue)
+            )
+        
+        max_tasks = min(max(1, request.max_tasks), allowance)
+        
+        count = min(max_tasks, len(self.queue))
+        tasks = [self.queue.popleft() for _ in range(count)]
+        if tasks:
+            self._charge(request.analyzer_id, request.weight, len(tasks))
+        
+        wait_seconds = min(request.wait_seconds, self.max_long_poll_seconds)
+        if not tasks and wait_seconds > 0:
+            tasks = await self._wait_for_tasks(
+                _Waiter(request.analyzer_id, request.weight, max_tasks),
+                wait_seconds
+            )
+        
+        if not tasks:
+            return WorkBatchResponse(
+                has_work=False,
+                message="Queue is empty",
+                queue_depth=len(self.queue)
+            )
+        
+        items = []
+        for task in tasks:
+            log_data = await self._assign_task(task, request.analyzer_id)
+            if log_data:
+                items.append(WorkItem(task_id=task.task_id, log_data=log_data))
+        
+        return WorkBatchResponse(
+            tasks=items,
+            has_work=bool(items),
+            message="Work assigned" if items else "Data not found",
+            queue_depth=len(self.queue)
+        )
+    
+    async def _wait_for_tasks(self, waiter: _Waiter, wait_seconds: float) -> List[Task]:
+        """
+        Register a long-poll waiter and wait for work to be dispatched to it.
+        
+        Args:
+            waiter: The waiting request
+            wait_seconds: Maximum seconds to wait
+            
+        Returns:
+            Tasks dispatched to the waiter (empty if the wait expired)
+        """
+        loop = asyncio.get_running_loop()
+        self._waiters.append(waiter)
+        timer = loop.call_later(wait_seconds, self._expire_waiter, waiter)
+        
+        try:
+            return await waiter.future
+        except asyncio.CancelledError:
+            # Tasks may have been dispatched just as the request was
+            # cancelled; put them back rather than stranding them
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.queue.extendleft(reversed(waiter.future.result()))
+                self._dispatch_to_waiters()
+            raise
+        finally:
+            timer.cancel()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+    
+    def _expire_waiter(self, waiter: _Waiter):
+        """End a long-poll wait with no work (call_later callback)."""
+        if waiter in self._waiters:
+            self._waiters.remove(waiter)
+        if not waiter.future.done():
+            waiter.future.set_result([])
+    
+    def _inflight_allowance(self, analyzer_id: str, weight: float) -> int:
+        """Number of further tasks an analyzer of this weight may be assigned right now."""
+        max_inflight = max(1, math.ceil(weight * self.inflight_per_weight))
+        return max_inflight - self.analyzer_load.get(analyzer_id, 0)
+    
+    def _unload(self, task: Task):
+        """Stop counting a task against the analyzer it was assigned to."""
+        analyzer_id = task.assigned_to
+        load = self.analyzer_load.get(analyzer_id, 0) - 1
+        if load > 0:
+            self.analyzer_load[analyzer_id] = load
+        else:
+            self.analyzer_load.pop(analyzer_id, None)
+    
+    def _virtual_start(self, analyzer_id: str) -> float:
+        """
+        Virtual time at which an analyzer's next dispatch starts.
+        
+        An analyzer that has been idle starts from the current virtual clock,
+        so it can't claim a backlog of unused share.
+        """
+        return max(self._virtual_times.get(analyzer_id, 0.0), self._virtual_clock)
+    
+    def _charge(self, analyzer_id: str, weight: float, count: int):
+        """Advance an analyzer's virtual time for count dispatched tasks."""
+        start = self._virtual_start(analyzer_id)
+        self._virtual_times[analyzer_id] = start + count / max(weight, 0.01)
+        self._virtual_clock = start
+    
+    def _dispatch_to_waiters(self):
+        """
+        Hand queued tasks to long-polling analyzers, weighted-fair.
+        
+        Repeatedly serves the waiter with the smallest virtual time until
+        the queue or the waiters run out. Each waiter's virtual time is
+        lowered by the time it has been waiting / aging_interval_seconds,
+        so a long wait eventually wins regardless of weight. Runs without
+        awaiting, so the queue cannot change underneath it.
+        """
+        now = asyncio.get_running_loop().time()
+        
+        while self.queue and self._waiters:
+            waiter = min(
+                self._waiters,
+                key=lambda w: (
+                    self._virtual_start(w.analyzer_id)
+                    - (now - w.since) / self.aging_interval_seconds
+                )
+            )
+            self._waiters.remove(waiter)
+            if waiter.future.done():
+                continue
+            
+            count = min(waiter.max_tasks, len(self.queue))
+            tasks = [self.queue.popleft() for _ in range(count)]
+            self._charge(waiter.analyzer_id, waiter.weight, count)
+            waiter.future.set_result(tasks)
+    
+    async def release_tasks(self, task_ids: List[str]):
+        """
+        Put assigned tasks back at the front of the queue.
+        
+        Used when an assignment never reached the analyzer (e.g. it went
+        away during a long-poll), so no retry is counted.
+        
+        Args:
+            task_ids: IDs of in-progress tasks to release
+        """
+        released = []
+        for task_id in task_ids:
+            task = self.in_progress.pop(task_id, None)
+            if task:
+                self._unload(task)
+                task.release()
+                released.append(task)
+        
+        if released:
+            self.queue.extendleft(reversed(released))
+            self._dispatch_to_waiters()
+            self._notify_state_change()
+    
+    async def _assign_task(self, task: Task, analyzer_id: str) -> Optional[LogMessage]:
+        """
+        Move a dequeued task to in-progress for an analyzer.
+        
+        Args:
+            task: Task just taken from the queue
+            analyzer_id: Analyzer receiving the task
+            
+        Returns:
+            The task's log data, or None if it is missing
+        """
+        # Move to in-progress
+        task.assign_to_analyzer(analyzer_id)
+        
+        self.in_progress[task.task_id] = task
+        heapq.heappush(
+            self._deadlines,
+            (task.last_heartbeat + self.task_timeout_seconds, task.task_id)
+        )
+        self.analyzer_load[analyzer_id] = self.analyzer_load.get(analyzer_id, 0) + 1
+        self._notify_state_change()
+        
+        log_data = task.log_data
+        
+        if not log_data:
+            logger.error(f"Data not found for task {task.task_id}")
+            return None
+        
+        # Log work assignment with metadata
+        self.logger.info(
+            "%s | task=%s | to=%s | level=%s | "
+            "msg='%.40s...' | queue_depth=%d",
+            _LOG_ASSIGNED, task.task_id, analyzer_id,
+            log_data.level, log_data.message, len(self.queue)
+        )
+        
+        return log_data
+    
     async def update_status(self, update: StatusUpdate):
         """
         Receive status update from analyzer (serves as heartbeat).
@@ -226,61 +544,69 @@ class Distributor:
         """
         task_id = update.task_id
         
-        async with self.in_progress_lock:
-            if task_id not in self.in_progress:
-                logger.warning(f"Received update for unknown task {task_id}")
-                return
+        if task_id not in self.in_progress:
+            logger.warning(f"Received update for unknown task {task_id}")
+            return
+        
+        task = self.in_progress[task_id]
+        
+        if update.status is TaskStatus.IN_PROGRESS:
+            # Heartbeat
+            task.update_heartbeat()
+            self.total_heartbeats += 1
+            self.logger.debug(
+                "%s | task=%s | from=%s | status=%s",
+                _LOG_HEARTBEAT, task_id, update.analyzer_id,
+                update.status
+            )
+        
+        elif update.status is TaskStatus.COMPLETED:
+            # Task completed
+            task.mark_completed()
+            self.recent_completed.append(task)
+            del self.in_progress[task_id]
+            self._unload(task)
+            self.total_tasks_completed += 1
             
-            task = self.in_progress[task_id]
+            self.logger.info(
+                "%s | task=%s | by=%s | status=%s",
+                _LOG_COMPLETED, task_id, update.analyzer_id,
+                update.status
+            )
             
-            if update.status == TaskStatus.IN_PROGRESS:
-                # Heartbeat
-                task.update_heartbeat()
-                self.logger.info(
-                    f"{Colors.YELLOW}HEARTBEAT{Colors.RESET} | "
-                    f"task={task_id[:8]} | "
-                    f"from={update.analyzer_id} | "
-                    f"status={update.status}"
-                )
+            # Drop the log data (the task is kept in the recent history)
+            task.log_data = None
             
-            elif update.status == TaskStatus.COMPLETED:
-                # Task completed
-                task.mark_completed()
-                self.completed[task_id] = task
-                del self.in_progress[task_id]
-                self.total_tasks_completed += 1
-                
-                self.logger.info(
-                    f"{Colors.GREEN}TASK COMPLETED{Colors.RESET} | "
-                    f"task={task_id[:8]} | "
-                    f"by={update.analyzer_id} | "
-                    f"status={update.status}"
-                )
-                
-                # Clean up data
-                async with self.data_lock:
-                    if task_id in self.data_store:
-                        del self.data_store[task_id]
+            self._notify_state_change()
+        
+        elif update.status is TaskStatus.FAILED:
+            # Task failed
+            task.mark_failed()
+            self.recent_failed.append(task)
+            del self.in_progress[task_id]
+            self._unload(task)
+            self.total_tasks_failed += 1
             
-            elif update.status == TaskStatus.FAILED:
-                # Task failed
-                task.mark_failed()
-                self.failed[task_id] = task
-                del self.in_progress[task_id]
-                self.total_tasks_failed += 1
-                
-                self.logger.warning(
-                    f"{Colors.MAGENTA}TASK FAILED{Colors.RESET} | "
-                    f"task={task_id[:8]} | "
-                    f"by={update.analyzer_id} | "
-                    f"status={update.status} | "
-                    f"reason={update.message or 'N/A'}"
-                )
-                
-                # Clean up data
-                async with self.data_lock:
-                    if task_id in self.data_store:
-                        del self.data_store[task_id]
+            self.logger.warning(
+                "%s | task=%s | by=%s | status=%s | reason=%s",
+                _LOG_FAILED, task_id, update.analyzer_id,
+                update.status, update.message or 'N/A'
+            )
+            
+            # Drop the log data (the task is kept in the recent history)
+            task.log_data = None
+            
+            self._notify_state_change()
+    
+    async def update_status_batch(self, updates: List[StatusUpdate]):
+        """
+        Apply a batch of status updates in order.
+        
+        Args:
+            updates: Status updates from an analyzer
+        """
+        for update in updates:
+            await self.update_status(update)
     
     async def _background_monitor(self):
         """
@@ -293,55 +619,91 @@ class Distributor:
         while self.running:
             try:
                 await self._check_timeouts()
-                await self._check_scaling()
+                
+                # One metrics snapshot per tick, shared by everything below
+                metrics = await self.get_metrics()
+                await self._check_scaling(metrics)
+                self._log_heartbeat_summary(metrics)
             except Exception as e:
                 logger.error(f"Error in background monitor: {e}")
             
             await asyncio.sleep(self.monitor_interval_seconds)
     
+    def _log_heartbeat_summary(self, metrics: ScalingMetrics):
+        """
+        Log the number of heartbeats received since the last summary.
+        
+        Args:
+            metrics: Metrics from the current monitor tick
+        """
+        count = self.total_heartbeats - self._heartbeats_logged
+        if count > 0:
+            self.logger.info(
+                "%s | received=%d in the last %ss | in_progress=%d",
+                _LOG_HEARTBEATS, count,
+                self.monitor_interval_seconds, metrics.in_progress_count
+            )
+            self._heartbeats_logged = self.total_heartbeats
+    
     async def _check_timeouts(self):
         """Check for timed-out tasks and requeue them."""
-        timed_out_tasks = []
+        now = time.monotonic()
+        deadlines = self._deadlines
         
-        async with self.in_progress_lock:
-            for task_id, task in list(self.in_progress.items()):
-                if task.should_requeue(self.task_timeout_seconds):
-                    timed_out_tasks.append((task_id, task))
+        timed_out = []
+        while deadlines and deadlines[0][0] < now:
+            _, task_id = heapq.heappop(deadlines)
+            task = self.in_progress.get(task_id)
+            if task is None:
+                continue  # Already finished or released
+            
+            # Judged against the same `now` as the loop condition, so a
+            # re-pushed deadline is never already due (no re-pop spin)
+            deadline = task.last_heartbeat + self.task_timeout_seconds
+            if deadline < now:
+                timed_out.append((task_id, task))
+            else:
+                # Heartbeats arrived since this entry was pushed
+                heapq.heappush(deadlines, (deadline, task_id))
         
-        # Requeue timed-out tasks (to front of queue for priority)
-        for task_id, task in timed_out_tasks:
+        requeued = []
+        for task_id, task in timed_out:
+            del self.in_progress[task_id]
+            self._unload(task)
+            assigned_to = task.assigned_to
+            
             if task.requeue():
-                # Put at front of queue (priority)
-                async with self.queue_lock:
-                    self.queue.appendleft(task)
-                
-                async with self.in_progress_lock:
-                    if task_id in self.in_progress:
-                        del self.in_progress[task_id]
-                
+                requeued.append(task)
                 self.total_tasks_requeued += 1
                 logger.warning(
-                    f"Task {task_id} timed out (assigned to {task.assigned_to}), "
+                    f"Task {task_id} timed out (assigned to {assigned_to}), "
                     f"requeued (retry {task.retry_count}/{task.max_retries})"
                 )
             else:
                 # Max retries exceeded
                 task.mark_failed()
-                self.failed[task_id] = task
+                task.log_data = None
+                self.recent_failed.append(task)
                 self.total_tasks_failed += 1
-                
-                async with self.in_progress_lock:
-                    if task_id in self.in_progress:
-                        del self.in_progress[task_id]
-                
                 logger.error(
                     f"Task {task_id} exceeded max retries, marked as failed"
                 )
+        
+        # Put requeued tasks at the front of the queue (priority), in the
+        # order they timed out
+        self.queue.extendleft(reversed(requeued))
+        
+        if timed_out:
+            self._dispatch_to_waiters()
+            self._notify_state_change()
     
-    async def _check_scaling(self):
-        """Check if scaling is needed based on backpressure."""
-        metrics = await self.get_metrics()
+    async def _check_scaling(self, metrics: ScalingMetrics):
+        """
+        Check if scaling is needed based on backpressure.
         
+        Args:
+            metrics: Metrics from the current monitor tick
+        """
         # If we have a scaler, notify it of metrics
         if self.scaler and metrics.queue_depth > self.backpressure_threshold:
             logger.info(
@@ -354,14 +716,24 @@ class Distributor:
         """
         Get current metrics for scaling decisions.
         
+        The result is reused while the queue/in-progress state is unchanged,
+        for at most metrics_cache_seconds (so back-to-back /stats and
+        /metrics requests build it once).
+        
         Returns:
             ScalingMetrics object
         """
-        async with self.queue_lock:
-            queue_depth = len(self.queue)
+        now = asyncio.get_running_loop().time()
+        if (
+            self._metrics_cache is not None
+            and self._metrics_cache_version == self.state_version
+            and now - self._metrics_cache_time < self.metrics_cache_seconds
+        ):
+            return self._metrics_cache
         
-        async with self.in_progress_lock:
-            in_progress_count = len(self.in_progress)
+        queue_depth = len(self.queue)
+        
+        in_progress_count = len(self.in_progress)
         
         # Get analyzer count from scaler
         total_analyzers = 0
@@ -376,13 +748,16 @@ class Distributor:
             else queue_depth
         )
         
-        return ScalingMetrics(
+        self._metrics_cache = ScalingMetrics(
             queue_depth=queue_depth,
             in_progress_count=in_progress_count,
             total_analyzers=total_analyzers,
             active_analyzers=active_analyzers,
             queue_backpressure=backpressure
         )
+        self._metrics_cache_version = self.state_version
+        self._metrics_cache_time = now
+        return self._metrics_cache
     
     async def get_stats(self) -> Dict:
         """Get distributor statistics."""
@@ -391,12 +766,13 @@ class Distributor:
         return {
             "queue_depth": metrics.queue_depth,
             "in_progress": metrics.in_progress_count,
-            "completed": len(self.completed),
-            "failed": len(self.failed),
+            "completed": self.total_tasks_completed,
+            "failed": self.total_tasks_failed,
             "total_received": self.total_tasks_received,
             "total_completed": self.total_tasks_completed,
             "total_failed": self.total_tasks_failed,
             "total_requeued": self.total_tasks_requeued,
+            "total_heartbeats": self.total_heartbeats,
             "backpressure": metrics.queue_backpressure,
             "analyzers": {
                 "total": metrics.total_analyzers,
@@ -404,6 +780,44 @@ class Distributor:
             }
         }
     
+    def _notify_state_change(self):
+        """Bump state_version and wake every watch_stats() subscriber."""
+        self.state_version += 1
+        if self._state_watchers:
+            # Swap in a fresh event so waiters that already woke can wait
+            # again without a clear() racing with other waiters
+            self._state_changed.set()
+            self._state_changed = asyncio.Event()
+    
+    async def watch_stats(
+        self,
+        min_interval: float = 0.05,
+        heartbeat_seconds: float = 5.0
+    ) -> AsyncIterator[Dict]:
+        """
+        Yield distributor statistics now and again after each state change.
+        
+        Changes arriving within min_interval of each other are coalesced into
+        one update. If nothing changes, stats are re-sent every
+        heartbeat_seconds so the stream stays alive.
+        
+        Args:
+            min_interval: Minimum seconds between updates
+            heartbeat_seconds: Maximum seconds between updates
+        """
+        self._state_watchers += 1
+        try:
+            while True:
+                changed = self._state_changed
+                yield await self.get_stats()
+                await asyncio.sleep(min_interval)
+                try:
+                    await asyncio.wait_for(changed.wait(), heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self._state_watchers -= 1
+    
     async def reset_stats(self):
         """
         Reset all statistics counters and clear all data structures.
@@ -412,24 +826,29 @@ class Distributor:
         without restarting the distributor.
         """
         # Clear all data structures
-        async with self.queue_lock:
-            self.queue.clear()
+        self.queue.clear()
         
-        async with self.in_progress_lock:
-            self.in_progress.clear()
+        self.in_progress.clear()
+        self._deadlines.clear()
+        self.analyzer_load.clear()
         
-        async with self.data_lock:
-            self.data_store.clear()
+        # Start weighted-fair dispatch afresh
+        self._virtual_times.clear()
+        self._virtual_clock = 0.0
         
         # Clear completed/failed tracking
-        self.completed.clear()
-        self.failed.clear()
+        self.recent_completed.clear()
+        self.recent_failed.clear()
         
         # Reset statistics counters
         self.total_tasks_received = 0
         self.total_tasks_completed = 0
         self.total_tasks_failed = 0
         self.total_tasks_requeued = 0
+        self.total_heartbeats = 0
+        self._heartbeats_logged = 0
+        
+        self._notify_state_change()
         
         self.logger.info(f"{Colors.BOLD}{Colors.GREEN}✓ Statistics reset - all counters cleared{Colors.RESET}")
 
@@ -440,6 +859,79 @@ app = FastAPI(title="Log Distributor", version="2.0.0")
 # Global distributor instance
 distributor: Optional[Distributor] = None
 
+# /stats bodies by format, reused while the distributor state is unchanged
+# (and for at most _STATS_CACHE_SECONDS) so concurrent observers share one
+# encoding: fmt -> (state version, loop time, body)
+_STATS_CACHE_SECONDS = 0.5
+_STATS_CACHE_CONTROL = "public, max-age=0, s-maxage=1"
+_STATS_ENCODERS = {
+    "json": (orjson.dumps, "application/json"),
+    "msgpack": (msgpack.packb, "application/msgpack"),
+}
+_stats_cache: Dict[str, Tuple[int, float, bytes]] = {}
+
+# Validates the status update batches received over /ws/status
+_STATUS_BATCH_ADAPTER = TypeAdapter(List[StatusUpdate])
+
+_Model = TypeVar("_Model", bound=BaseModel)
+
+
+def _json_body(model: Type[_Model]) -> Callable[[Request], Awaitable[_Model]]:
+    """
+    Dependency parsing the request body as model in a single pass.
+    
+    FastAPI parses JSON bodies with json.loads() and then validates the
+    result; model_validate_json() does both at once from the raw bytes. Used
+    on the per-log submission endpoints.
+    
+    Args:
+        model: Pydantic model of the body
+        
+    Returns:
+        Dependency returning the validated body (422 on invalid input, like
+        a regular body parameter)
+    """
+    async def parse(request: Request) -> _Model:
+        try:
+            return model.model_validate_json(await request.body())
+        except ValidationError as e:
+            raise RequestValidationError(
+                [{**error, "loc": ("body", *error["loc"])} for error in e.errors(include_url=False)]
+            )
+    
+    return parse
+
+
+# Schemas of models nested in _json_request_body() bodies, added to the
+# OpenAPI components by _openapi() so their $refs always resolve
+_REQUEST_BODY_SCHEMAS: Dict[str, dict] = {}
+
+
+def _json_request_body(model: Type[BaseModel]) -> dict:
+    """OpenAPI requestBody for an endpoint reading model via _json_body()."""
+    schema = model.model_json_schema(ref_template="#/components/schemas/{model}")
+    _REQUEST_BODY_SCHEMAS.update(schema.pop("$defs", {}))
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}}
+        }
+    }
+
+
+_default_openapi = app.openapi
+
+
+def _openapi() -> dict:
+    """FastAPI's OpenAPI schema, plus the models nested in request bodies."""
+    schema = _default_openapi()
+    components = schema.setdefault("components", {}).setdefault("schemas", {})
+    for name, definition in _REQUEST_BODY_SCHEMAS.items():
+        components.setdefault(name, definition)
+    return schema
+
+
+app.openapi = _openapi
 
 @app.on_event("startup")
 async def startup():
@@ -464,7 +956,9 @@ async def startup():
     distributor = Distributor(
         task_timeout_seconds=30,
         backpressure_threshold=100,
-        monitor_interval_seconds=5
+        monitor_interval_seconds=5,
+        aging_interval_seconds=10.0,
+        inflight_per_weight=20.0
     )
     await distributor.start()
     logger.info(f"{Colors.BOLD}{Colors.CYAN}Distributor API started{Colors.RESET}")
@@ -479,7 +973,7 @@ async def shutdown():
 
 
 @app.get("/")
-async def root():
+async def root() -> dict:
     """Root endpoint."""
     return {
         "service": "Log Distributor",
@@ -489,13 +983,13 @@ async def root():
 
 
 @app.get("/health")
-async def health():
+async def health() -> dict:
     """Health check."""
     return {"status": "healthy"}
 
 
-@app.post("/submit")
-async def submit_log(log: LogMessage):
+@app.post("/submit", openapi_extra=_json_request_body(LogMessage))
+async def submit_log(log: LogMessage = Depends(_json_body(LogMessage))) -> dict:
     """
     Submit a log for processing (called by Emitters).
     
@@ -516,8 +1010,31 @@ async def submit_log(log: LogMessage):
     }
 
 
+@app.post("/ingest/batch", openapi_extra=_json_request_body(LogBatch))
+async def ingest_batch(batch: LogBatch = Depends(_json_body(LogBatch))) -> dict:
+    """
+    Submit several logs for processing in one request (called by Emitters).
+    
+    Args:
+        batch: Log messages to process, queued in order
+        
+    Returns:
+        task_ids (in submission order) and status
+    """
+    if not distributor:
+        raise HTTPException(status_code=503, detail="Distributor not initialized")
+    
+    task_ids = await distributor.submit_log_batch(batch.logs)
+    
+    return {
+        "status": "accepted",
+        "task_ids": task_ids,
+        "count": len(task_ids)
+    }
+
+
 @app.post("/get_work")
-async def get_work(request: WorkRequest):
+async def get_work(request: WorkRequest) -> WorkResponse:
     """
     Get work for an analyzer (called by Analyzers).
     
@@ -534,8 +1051,33 @@ async def get_work(request: WorkRequest):
     return response
 
 
+@app.post("/get_work_batch")
+async def get_work_batch(request: WorkRequest, http_request: Request) -> WorkBatchResponse:
+    """
+    Get up to max_tasks tasks for an analyzer in one round-trip.
+    
+    Args:
+        request: Work request from analyzer
+        
+    Returns:
+        WorkBatchResponse with the assigned tasks
+    """
+    if not distributor:
+        raise HTTPException(status_code=503, detail="Distributor not initialized")
+    
+    response = await distributor.get_work_batch(request)
+    
+    # A long-poll can outlive the analyzer that made it (e.g. it was scaled
+    # down while waiting); hand the work back instead of stranding it
+    if response.tasks and await http_request.is_disconnected():
+        await distributor.release_tasks([item.task_id for item in response.tasks])
+        return WorkBatchResponse(has_work=False, message="Requester disconnected")
+    
+    return response
+
+
 @app.post("/status")
-async def update_status(update: StatusUpdate):
+async def update_status(update: StatusUpdate) -> dict:
     """
     Receive status update from analyzer (heartbeat).
     
@@ -550,18 +1092,117 @@ async def update_status(update: StatusUpdate):
     return {"status": "acknowledged"}
 
 
+@app.post("/status_batch")
+async def update_status_batch(updates: List[StatusUpdate]) -> dict:
+    """
+    Receive a batch of status updates from an analyzer.
+    
+    Args:
+        updates: Status updates, applied in order
+    """
+    if not distributor:
+        raise HTTPException(status_code=503, detail="Distributor not initialized")
+    
+    await distributor.update_status_batch(updates)
+    
+    return {"status": "acknowledged", "count": len(updates)}
+
+
+@app.websocket("/ws/status")
+async def status_stream(websocket: WebSocket):
+    """
+    Receive status updates from an analyzer over one persistent connection.
+    
+    Each message is a JSON list of status updates (the /status_batch body),
+    applied in order and acknowledged with the /status_batch reply, so
+    heartbeats cost a WebSocket frame instead of an HTTP request.
+    """
+    if not distributor:
+        await websocket.close(code=1013)  # Try again later
+        return
+    
+    await websocket.accept()
+    try:
+        while True:
+            message = await websocket.receive_bytes()
+            try:
+                updates = _STATUS_BATCH_ADAPTER.validate_json(message)
+            except ValidationError as e:
+                logger.warning(f"Invalid status updates on /ws/status: {e}")
+                await websocket.close(code=1007)  # Invalid payload data
+                return
+            
+            await distributor.update_status_batch(updates)
+            await websocket.send_bytes(
+                orjson.dumps({"status": "acknowledged", "count": len(updates)})
+            )
+    except WebSocketDisconnect:
+        pass
+
+
 @app.get("/stats")
-async def get_stats():
-    """Get distributor statistics."""
+async def get_stats(fmt: str = "json"):
+    """
+    Get distributor statistics.
+    
+    The encoded body is reused until the distributor state changes (for at
+    most _STATS_CACHE_SECONDS) and marked cacheable by shared caches, so
+    frequent pollers share one response.
+    
+    Args:
+        fmt: Response encoding, "json" (default) or "msgpack"
+    """
+    if not distributor:
+        raise HTTPException(status_code=503, detail="Distributor not initialized")
+    
+    if fmt not in _STATS_ENCODERS:
+        raise HTTPException(status_code=400, detail=f"Unsupported stats format: {fmt}")
+    
+    encode, media_type = _STATS_ENCODERS[fmt]
+    now = asyncio.get_running_loop().time()
+    cached = _stats_cache.get(fmt)
+    if (
+        cached is None
+        or cached[0] != distributor.state_version
+        or now - cached[1] > _STATS_CACHE_SECONDS
+    ):
+        version = distributor.state_version
+        cached = (version, now, encode(await distributor.get_stats()))
+        _stats_cache[fmt] = cached
+    
+    return Response(
+        content=cached[2],
+        media_type=media_type,
+        headers={"Cache-Control": _STATS_CACHE_CONTROL}
+    )
+
+
+@app.get("/events")
+async def stream_events(http_request: Request):
+    """
+    Stream distributor statistics as Server-Sent Events.
+    
+    Sends the current /stats payload immediately and again whenever the
+    queue or in-progress state changes, so clients can wait for a
+    condition (e.g. a drained queue) without polling.
+    """
     if not distributor:
         raise HTTPException(status_code=503, detail="Distributor not initialized")
     
-    stats = await distributor.get_stats()
-    return stats
+    async def event_stream():
+        # aclosing: on disconnect the subscription is released right away,
+        # not whenever the abandoned generator is garbage collected
+        async with aclosing(distributor.watch_stats()) as updates:
+            async for stats in updates:
+                if await http_request.is_disconnected():
+                    break
+                yield b"data: " + orjson.dumps(stats) + b"\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 
 @app.get("/metrics")
-async def get_metrics():
+async def get_metrics() -> ScalingMetrics:
     """Get scaling metrics."""
     if not distributor:
         raise HTTPException(status_code=503, detail="Distributor not initialized")
@@ -571,7 +1212,7 @@ async def get_metrics():
 
 
 @app.post("/reset")
-async def reset():
+async def reset() -> dict:
     """
     Reset all distributor statistics and clear all data.
     
@@ -1,15 +1,17 @@
 """
 Data models for the pull-based work queue system.
 """
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, Optional
-from pydantic import BaseModel, Field, validator
-from enum import Enum
-import uuid
+from typing import Dict, Any, Optional, List
+from pydantic import BaseModel, Field
+from enum import StrEnum
+import itertools
+import time
 
 
-class LogLevel(str, Enum):
-    """Log severity levels."""
+class LogLevel(StrEnum):
+    """Log severity levels (members are the plain strings themselves)."""
     DEBUG = "DEBUG"
     INFO = "INFO"
     WARN = "WARN"
@@ -30,8 +32,15 @@ class LogMessage(BaseModel):
     metadata: Dict[str, Any] = Field(default_factory=dict)
 
 
-class TaskStatus(str, Enum):
-    """Status of a task in the system."""
+class LogBatch(BaseModel):
+    """
+    Several log messages submitted in one request.
+    """
+    logs: List[LogMessage]
+
+
+class TaskStatus(StrEnum):
+    """Status of a task in the system (members are the plain strings themselves)."""
     QUEUED = "queued"           # In the main queue waiting
     IN_PROGRESS = "in_progress" # Being processed by an analyzer
     COMPLETED = "completed"     # Successfully processed
@@ -39,39 +48,57 @@ class TaskStatus(str, Enum):
     TIMEOUT = "timeout"         # Timed out (will be requeued)
 
 
-class Task(BaseModel):
+# Task IDs are the process start time (ms, hex) plus a sequence number: unique
+# across distributor restarts, ordered, short and much cheaper than uuid4()
+_TASK_ID_PREFIX = f"{int(time.time() * 1000):x}-"
+_task_seq = itertools.count(1)
+
+
+def _next_task_id() -> str:
+    """Return a new unique task ID."""
+    return f"{_TASK_ID_PREFIX}{next(_task_seq):x}"
+
+
+@dataclass(slots=True)
+class Task:
     """
-    Task metadata that lives in the queue.
+    A unit of work that lives in the queue.
+    
+    Carries its log data directly, so handing out a task needs no separate
+    lookup. The data is dropped once the task completes or fails.
     
-    The actual log data is stored separately and referenced by task_id.
-    This allows the queue to be lightweight (just metadata).
+    Tasks never cross the API (analyzers receive WorkItems), so this is a
+    plain slotted dataclass rather than a validated model: one is created
+    per submitted log and kept until it leaves the recent history.
     """
-    task_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    task_id: str = field(default_factory=_next_task_id)
+    
+    # All task times are time.monotonic() seconds: cheap to take on every
+    # heartbeat, smaller than datetimes and unaffected by wall-clock adjustments
+    created_at: float = field(default_factory=time.monotonic)
     status: TaskStatus = TaskStatus.QUEUED
     
     # Analyzer assignment
     assigned_to: Optional[str] = None  # Analyzer ID
-    assigned_at: Optional[datetime] = None
-    last_heartbeat: Optional[datetime] = None
+    assigned_at: Optional[float] = None
+    last_heartbeat: Optional[float] = None
     
     # Retry tracking
     retry_count: int = 0
     max_retries: int = 3
     
-    # Reference to actual data (stored in Distributor's data store)
-    data_key: str = ""  # Will be same as task_id by default
+    # The log to process (None once the task has finished)
+    log_data: Optional[LogMessage] = None
     
     def assign_to_analyzer(self, analyzer_id: str):
         """Mark task as assigned to an analyzer."""
         self.status = TaskStatus.IN_PROGRESS
         self.assigned_to = analyzer_id
-        self.assigned_at = datetime.utcnow()
-        self.last_heartbeat = datetime.utcnow()
+        self.assigned_at = self.last_heartbeat = time.monotonic()
     
     def update_heartbeat(self):
         """Update the last heartbeat timestamp."""
-        self.last_heartbeat = datetime.utcnow()
+        self.last_heartbeat = time.monotonic()
     
     def mark_completed(self):
         """Mark task as completed."""
@@ -91,14 +118,20 @@ class Task(BaseModel):
         Returns:
             True if task should be requeued
         """
-        if self.status != TaskStatus.IN_PROGRESS:
+        if self.status is not TaskStatus.IN_PROGRESS:
             return False
         
-        if not self.last_heartbeat:
+        if self.last_heartbeat is None:
             return False
         
-        elapsed = (datetime.utcnow() - self.last_heartbeat).total_seconds()
-        return elapsed > timeout_seconds
+        return time.monotonic() - self.last_heartbeat > timeout_seconds
+    
+    def release(self):
+        """Return an assigned task to the queue without counting a retry."""
+        self.status = TaskStatus.QUEUED
+        self.assigned_to = None
+        self.assigned_at = None
+        self.last_heartbeat = None
     
     def requeue(self):
         """
@@ -136,6 +169,8 @@ class WorkRequest(BaseModel):
     analyzer_id: str
     weight: float  # Capacity/concurrency level
     current_tasks: int  # How many tasks currently processing
+    max_tasks: int = 1  # How many tasks to hand out in one response (batch)
+    wait_seconds: float = 0.0  # Long-poll: how long to wait for work if queue is empty
 
 
 class WorkResponse(BaseModel):
@@ -148,6 +183,24 @@ class WorkResponse(BaseModel):
     message: str = "No work available"
 
 
+class WorkItem(BaseModel):
+    """
+    A single task handed out in a batch work response.
+    """
+    task_id: str
+    log_data: LogMessage
+
+
+class WorkBatchResponse(BaseModel):
+    """
+    Response to an analyzer's batch work request.
+    """
+    tasks: List[WorkItem] = Field(default_factory=list)
+    has_work: bool = False
+    message: str = "No work available"
+    queue_depth: int = 0  # Tasks still queued, so pools can autoscale without /stats
+
+
 class ScalingMetrics(BaseModel):
     """
     Metrics used for scaling decisions.
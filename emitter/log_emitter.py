@@ -4,14 +4,42 @@ Log Emitter: Sends log messages to the Distributor.
 Simple client that applications/agents use to submit logs for processing.
 """
 import asyncio
+import bisect
+import heapq
 import httpx
 import logging
+import orjson
 import random
-from typing import Optional, List
+from typing import Optional, List, Tuple
 from datetime import datetime
 
 logger = logging.getLogger(__name__)
 
+# Request bodies are serialized with orjson and sent as raw content
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Synthetic log content generated by LogEmitterPool. Each message template
+# is paired with a function building its values from (rng, log_count), so
+# only the chosen message draws random numbers.
+_MESSAGE_TEMPLATES = (
+    ("Processing request #%d", lambda rng, n: (n,)),
+    ("Database query completed in %dms", lambda rng, n: (rng.randint(10, 500),)),
+    ("User authenticated successfully", lambda rng, n: ()),
+    ("Cache hit for key '%s_%d'", lambda rng, n: (rng.choice(_CACHE_KEYS), rng.randint(1000, 9999))),
+    ("API call to external service completed", lambda rng, n: ()),
+    ("Background job #%d started", lambda rng, n: (n,)),
+    ("File uploaded: %d bytes", lambda rng, n: (rng.randint(100, 10000),)),
+    ("Connection established with peer %d", lambda rng, n: (rng.randint(1, 100),)),
+    ("Transaction completed successfully", lambda rng, n: ()),
+    ("Health check passed", lambda rng, n: ()),
+)
+_CACHE_KEYS = ("user", "session", "config")
+_STATUS_CODES = (200, 200, 200, 201, 304, 400, 404, 500)
+
+# 70% INFO, 15% DEBUG, 10% WARN, 4% ERROR, 1% CRITICAL (cumulative)
+_LEVELS = ("INFO", "DEBUG", "WARN", "ERROR", "CRITICAL")
+_LEVEL_CUM_WEIGHTS = (0.70, 0.85, 0.95, 0.99)
+
 
 class LogEmitter:
     """
@@ -42,7 +70,17 @@ class LogEmitter:
         """
         self.distributor_url = distributor_url.rstrip("/")
         self.emitter_id = emitter_id
-        self.client = httpx.AsyncClient(timeout=timeout)
+        # Explicit pool: room for concurrent emit() calls, and idle
+        # connections kept across emission intervals longer than httpx's
+        # default 5s keep-alive expiry
+        self.client = httpx.AsyncClient(
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=1000,
+                max_keepalive_connections=200,
+                keepalive_expiry=30.0
+            )
+        )
         
         # Create custom logger with emitter ID
         self.logger = logging.getLogger(f"emitter.{emitter_id}")
@@ -73,37 +111,94 @@ class LogEmitter:
         Raises:
             Exception: If submission fails
         """
-        if timestamp is None:
-            timestamp = datetime.utcnow()
-        
-        if metadata is None:
-            metadata = {}
-        
-        log_data = {
-            "timestamp": timestamp.isoformat(),
-            "level": level,
-            "message": message,
-            "source": source,
-            "metadata": metadata
-        }
+        log_data = self.build_log(message, level, source, metadata, timestamp)
         
         try:
             response = await self.client.post(
                 f"{self.distributor_url}/submit",
-                json=log_data
+                content=orjson.dumps(log_data),
+                headers=_JSON_HEADERS
             )
             response.raise_for_status()
             
-            result = response.json()
+            result = orjson.loads(response.content)
             task_id = result.get("task_id")
             
-            self.logger.debug(f"Emitted log: task_id={task_id}")
+            self.logger.debug("Emitted log: task_id=%s", task_id)
             return task_id
             
         except Exception as e:
-            self.logger.error(f"Failed to emit log: {e}")
+            self.logger.error("Failed to emit log: %s", e)
+            raise
+    
+    async def emit_batch(self, logs: List[dict]) -> List[str]:
+        """
+        Emit several log messages to the distributor in one request.
+        
+        Args:
+            logs: Log payloads, as built by build_log()
+            
+        Returns:
+            task_ids: IDs of the created tasks, in the same order
+            
+        Raises:
+            Exception: If submission fails
+        """
+        try:
+            response = await self.client.post(
+                f"{self.distributor_url}/ingest/batch",
+                content=orjson.dumps({"logs": logs}),
+                headers=_JSON_HEADERS
+            )
+            response.raise_for_status()
+            
+            task_ids = orjson.loads(response.content).get("task_ids", [])
+            
+            self.logger.debug("Emitted batch of %d logs", len(task_ids))
+            return task_ids
+            
+        except Exception as e:
+            self.logger.error("Failed to emit batch of %d logs: %s", len(logs), e)
             raise
     
+    @staticmethod
+    def build_log(
+        message: str,
+        level: str = "INFO",
+        source: str = "unknown",
+        metadata: Optional[dict] = None,
+        timestamp: Optional[datetime] = None
+    ) -> dict:
+        """
+        Build the payload for one log message.
+        
+        The timestamp is left as a datetime; orjson serializes it to the same
+        ISO 8601 string isoformat() would produce.
+        
+        Args:
+            message: Log message content
+            level: Log level (DEBUG, INFO, WARN, ERROR, CRITICAL)
+            source: Source of the log (app name, service, etc.)
+            metadata: Additional metadata as key-value pairs
+            timestamp: Log timestamp (defaults to now)
+            
+        Returns:
+            Log payload accepted by /submit and /ingest/batch
+        """
+        if timestamp is None:
+            timestamp = datetime.utcnow()
+        
+        if metadata is None:
+            metadata = {}
+        
+        return {
+            "timestamp": timestamp,
+            "level": level,
+            "message": message,
+            "source": source,
+            "metadata": metadata
+        }
+    
     async def close(self):
         """Close the HTTP client."""
         await self.client.aclose()
@@ -112,8 +207,10 @@ class LogEmitterPool:
     """
     Pool of log emitters that continuously send logs at randomized intervals.
     
-    Each emitter runs in its own asyncio task and sends logs every x ± y seconds,
-    simulating real-world log traffic patterns.
+    Each emitter sends logs every x ± y seconds, simulating real-world log
+    traffic patterns. A single scheduler task drives all emitters from one
+    merged timeline rather than one sleeping task per emitter, and a single
+    flusher task sends the generated logs to the distributor in batches.
     
     Usage:
         pool = LogEmitterPool(
@@ -133,7 +230,12 @@ class LogEmitterPool:
         num_emitters: int = 5,
         base_interval: float = 1.0,
         interval_jitter: float = 0.5,
-        emitter_prefix: str = "emitter"
+        emitter_prefix: str = "emitter",
+        batch_size: int = 32,
+        flush_ms: float = 50.0,
+        max_inflight_batches: int = 4,
+        max_buffered_logs: int = 1000,
+        seed: Optional[int] = None
     ):
         """
         Initialize the emitter pool.
@@ -144,26 +246,60 @@ class LogEmitterPool:
             base_interval: Base time between logs in seconds (x)
             interval_jitter: Random variation in seconds (±y)
             emitter_prefix: Prefix for emitter source names
+            batch_size: Maximum number of logs sent in one batch request
+            flush_ms: Maximum time a log waits in the buffer before its
+                batch is sent, in milliseconds
+            max_inflight_batches: Maximum number of batch requests awaiting
+                a response at once; the next batch is collected meanwhile
+            max_buffered_logs: Maximum number of logs waiting for the
+                flusher; while the buffer is full (distributor slow or down)
+                new logs are dropped and counted rather than buffered
+            seed: Seed for the pool's random generator, so intervals and log
+                content repeat from run to run (None for a fresh seed)
         """
         self.distributor_url = distributor_url
         self.num_emitters = num_emitters
         self.base_interval = base_interval
         self.interval_jitter = interval_jitter
         self.emitter_prefix = emitter_prefix
+        self.batch_size = batch_size
+        self.flush_ms = flush_ms
+        self.max_inflight_batches = max_inflight_batches
+        self.max_buffered_logs = max_buffered_logs
         
-        # Emitter tasks
-        self.emitters: List[LogEmitter] = []
+        # Emitter IDs (used as log sources; one client sends for all of them)
+        # and the scheduler task
+        self.emitter_ids: List[str] = []
         self.tasks: List[asyncio.Task] = []
+        
+        # Generated logs as (emitter_id, payload), sent in batches by the
+        # flusher task; None tells the flusher to send what it has and exit.
+        # Bounded, so a slow distributor applies backpressure (drops).
+        self._log_queue: asyncio.Queue[Optional[Tuple[str, dict]]] = asyncio.Queue(
+            maxsize=max_buffered_logs
+        )
+        self._batch_emitter: Optional[LogEmitter] = None
+        self._flusher_task: Optional[asyncio.Task] = None
         self.running = False
         
-        # Statistics (protected by lock for concurrent updates)
-        self.stats_lock = asyncio.Lock()
+        # Private generator for intervals and log content, so the pool
+        # neither disturbs nor depends on the process-wide random state
+        self._random = random.Random(seed)
+        
+        # Statistics (only updated in blocks that don't await, on the one
+        # event loop, so they need no lock)
         self.total_emitted = 0
+        self.total_dropped = 0
         self.emitter_stats = {}
         
+        # Set once total_emitted reaches _emit_target (see wait_for_emitted)
+        self._emit_target: Optional[int] = None
+        self._emit_target_reached = asyncio.Event()
+        
         logger.info(
             f"LogEmitterPool initialized: {num_emitters} emitters, "
-            f"interval={base_interval}±{interval_jitter}s"
+            f"interval={base_interval}±{interval_jitter}s, "
+            f"batch={batch_size} logs/{flush_ms}ms"
         )
     
     async def start(self):
@@ -174,148 +310,271 @@ class LogEmitterPool:
         
         self.running = True
         
-        # Create emitters and start their tasks
+        # Register emitters
         for i in range(self.num_emitters):
             emitter_id = f"{self.emitter_prefix}-{i+1}"
-            emitter = LogEmitter(self.distributor_url, emitter_id=emitter_id)
-            self.emitters.append(emitter)
-            
-            # Start emitter task
-            task = asyncio.create_task(
-                self._emitter_loop(emitter, emitter_id)
-            )
-            self.tasks.append(task)
+            self.emitter_ids.append(emitter_id)
             
             self.emitter_stats[emitter_id] = {
                 "count": 0,
-                "errors": 0
+                "errors": 0,
+                "dropped": 0
             }
         
+        # One flusher task sends every emitter's logs
+        self._batch_emitter = LogEmitter(
+            self.distributor_url, emitter_id=f"{self.emitter_prefix}-batch"
+        )
+        self._flusher_task = asyncio.create_task(self._flusher_loop())
+        
+        # One scheduler task drives every emitter
+        self.tasks.append(asyncio.create_task(self._scheduler_loop()))
+        
         logger.info(f"Started {self.num_emitters} emitters")
     
     async def stop(self):
-        """Stop all emitters."""
+        """
+        Stop all emitters.
+        
+        Returns once every buffered log has been sent and accepted (or has
+        failed), so callers don't need to wait for in-flight requests.
+        """
         if not self.running:
             return
         
         self.running = False
         
-        # Cancel all tasks
+        # Cancel the scheduler (no more new logs)
         for task in self.tasks:
             task.cancel()
         
         # Wait for cancellation
         await asyncio.gather(*self.tasks, return_exceptions=True)
         
-        # Close all emitters
-        for emitter in self.emitters:
-            await emitter.close()
+        # Let the flusher send the logs still buffered, then exit (waits
+        # for room if the buffer is full)
+        await self._log_queue.put(None)
+        await self._flusher_task
+        self._flusher_task = None
+        
+        # Close the one client that sent every emitter's logs
+        try:
+            await self._batch_emitter.close()
+        except Exception as e:
+            self._batch_emitter.logger.error(f"Error closing: {e}")
+        self._batch_emitter = None
         
         logger.info(f"Stopped all emitters (total logs emitted: {self.total_emitted})")
+        if self.total_dropped:
+            logger.warning(
+                f"Dropped {self.total_dropped} logs while the send buffer was full"
+            )
         
         # Clear state
         self.tasks.clear()
-        self.emitters.clear()
+        self.emitter_ids.clear()
     
-    async def _emitter_loop(self, emitter: LogEmitter, emitter_id: str):
+    async def _scheduler_loop(self):
         """
-        Main loop for a single emitter.
+        Drive all emitters from a single task.
         
-        Args:
-            emitter: LogEmitter instance
-            emitter_id: Unique identifier for this emitter
+        Keeps a min-heap of (deadline, emitter index) and wakes once per
+        deadline via loop.call_at, generating every log that is due in that
+        pass and handing it to the flusher.
         """
-        log_count = 0
-        
-        # Random seed per emitter for varied behavior
-        random.seed(hash(emitter_id))
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        schedule = [(now, index) for index in range(len(self.emitter_ids))]
+        heapq.heapify(schedule)
+        log_counts = [0] * len(self.emitter_ids)
         
         try:
-            while self.running:
-                # Generate and emit log
-                try:
-                    message = self._generate_log_message(emitter_id, log_count)
-                    level = self._generate_log_level()
-                    metadata = self._generate_metadata(emitter_id, log_count)
-                    
-                    await emitter.emit(
-                        message=message,
-                        level=level,
-                        source=emitter_id,
-                        metadata=metadata
+            while self.running and schedule:
+                deadline = schedule[0][0]
+                if deadline > loop.time():
+                    wakeup = loop.create_future()
+                    handle = loop.call_at(deadline, wakeup.set_result, None)
+                    try:
+                        await wakeup
+                    finally:
+                        handle.cancel()
+                
+                # Generate every log that is due, then schedule the next one.
+                # Logs generated in the same wake-up share one timestamp.
+                now = loop.time()
+                timestamp = datetime.utcnow()
+                while schedule and schedule[0][0] <= now:
+                    deadline, index = heapq.heappop(schedule)
+                    self._queue_log(
+                        self.emitter_ids[index], log_counts[index], timestamp
                     )
+                    log_counts[index] += 1
                     
-                    log_count += 1
-                    
-                    # Update stats with lock to prevent race conditions
-                    async with self.stats_lock:
-                        self.total_emitted += 1
-                        self.emitter_stats[emitter_id]["count"] += 1
-                    
-                    emitter.logger.debug(f"Emitted log #{log_count}")
+                    # Next deadline is relative to this one, but never in the
+                    # past (no burst of catch-up emissions after a stall)
+                    heapq.heappush(schedule, (max(deadline + self._next_interval(), now), index))
                     
-                except Exception as e:
-                    emitter.logger.error(f"Failed to emit: {e}")
-                    async with self.stats_lock:
-                        self.emitter_stats[emitter_id]["errors"] += 1
-                
-                # Sleep for randomized interval: base ± jitter
-                interval = self.base_interval + random.uniform(
-                    -self.interval_jitter,
-                    self.interval_jitter
-                )
-                interval = max(0.1, interval)  # Minimum 100ms
+        except asyncio.CancelledError:
+            logger.debug(f"Scheduler cancelled (emitted {self.total_emitted} logs)")
+    
+    def _next_interval(self) -> float:
+        """Randomized interval until an emitter's next log: base ± jitter."""
+        interval = self.base_interval + self._random.uniform(
+            -self.interval_jitter,
+            self.interval_jitter
+        )
+        return max(0.1, interval)  # Minimum 100ms
+    
+    def _queue_log(self, emitter_id: str, log_count: int, timestamp: datetime):
+        """
+        Generate one log for an emitter and buffer it for the flusher.
+        
+        If the buffer is full the log is not generated; it is counted as
+        dropped instead, so the scheduler never blocks.
+        
+        Args:
+            emitter_id: Emitter the log comes from (used as its source)
+            log_count: Number of logs this emitter has generated so far
+            timestamp: Log timestamp
+        """
+        if self._log_queue.full():
+            self.total_dropped += 1
+            self.emitter_stats[emitter_id]["dropped"] += 1
+            return
+        
+        log_data = LogEmitter.build_log(
+            message=self._generate_log_message(emitter_id, log_count),
+            level=self._generate_log_level(),
+            source=emitter_id,
+            metadata=self._generate_metadata(emitter_id, log_count),
+            timestamp=timestamp
+        )
+        self._log_queue.put_nowait((emitter_id, log_data))
+    
+    async def _flusher_loop(self):
+        """
+        Send buffered logs to the distributor in batches.
+        
+        A batch is sent once it holds batch_size logs or its oldest log has
+        waited flush_ms, whichever comes first. Up to max_inflight_batches
+        batches are sent concurrently; when that many are awaiting a
+        response, logs keep buffering until one completes. Exits after
+        sending what is buffered, and waiting for every send, when it
+        receives the None sentinel from stop().
+        """
+        loop = asyncio.get_running_loop()
+        flush_seconds = self.flush_ms / 1000
+        semaphore = asyncio.Semaphore(self.max_inflight_batches)
+        stopping = False
+        
+        async with asyncio.TaskGroup() as sends:
+            while not stopping:
+                item = await self._log_queue.get()
+                if item is None:
+                    break
                 
-                await asyncio.sleep(interval)
+                batch = [item]
+                flush_at = loop.time() + flush_seconds
+                while len(batch) < self.batch_size:
+                    # Take whatever is already buffered without waiting
+                    if not self._log_queue.empty():
+                        item = self._log_queue.get_nowait()
+                    else:
+                        remaining = flush_at - loop.time()
+                        if remaining <= 0:
+                            break
+                        try:
+                            item = await asyncio.wait_for(self._log_queue.get(), remaining)
+                        except asyncio.TimeoutError:
+                            break
+                    
+                    if item is None:
+                        stopping = True
+                        break
+                    batch.append(item)
                 
-        except asyncio.CancelledError:
-            emitter.logger.debug(f"Cancelled (emitted {log_count} logs)")
+                await semaphore.acquire()
+                sends.create_task(self._send_batch(batch, semaphore))
+    
+    async def _send_batch(self, batch: List[Tuple[str, dict]], semaphore: asyncio.Semaphore):
+        """
+        Post one batch of logs and update statistics.
+        
+        Args:
+            batch: (emitter_id, log payload) pairs
+            semaphore: In-flight batch slot, released once the request is done
+        """
+        try:
+            await self._batch_emitter.emit_batch([log_data for _, log_data in batch])
+        except Exception:
+            # emit_batch already logged the failure
+            for emitter_id, _ in batch:
+                self.emitter_stats[emitter_id]["errors"] += 1
+            return
+        finally:
+            semaphore.release()
+        
+        self.total_emitted += len(batch)
+        for emitter_id, _ in batch:
+            self.emitter_stats[emitter_id]["count"] += 1
+        
+        if (
+            self._emit_target is not None
+            and self.total_emitted >= self._emit_target
+        ):
+            self._emit_target_reached.set()
     
     def _generate_log_message(self, emitter_id: str, log_count: int) -> str:
         """Generate a realistic log message."""
-        messages = [
-            f"Processing request #{log_count}",
-            f"Database query completed in {random.randint(10, 500)}ms",
-            f"User authenticated successfully",
-            f"Cache hit for key '{random.choice(['user', 'session', 'config'])}_{random.randint(1000, 9999)}'",
-            f"API call to external service completed",
-            f"Background job #{log_count} started",
-            f"File uploaded: {random.randint(100, 10000)} bytes",
-            f"Connection established with peer {random.randint(1, 100)}",
-            f"Transaction completed successfully",
-            f"Health check passed",
-        ]
-        return random.choice(messages)
+        template, values = self._random.choice(_MESSAGE_TEMPLATES)
+        return template % values(self._random, log_count)
     
     def _generate_log_level(self) -> str:
         """Generate a log level with realistic distribution."""
-        # 70% INFO, 15% DEBUG, 10% WARN, 4% ERROR, 1% CRITICAL
-        rand = random.random()
-        if rand < 0.70:
-            return "INFO"
-        elif rand < 0.85:
-            return "DEBUG"
-        elif rand < 0.95:
-            return "WARN"
-        elif rand < 0.99:
-            return "ERROR"
-        else:
-            return "CRITICAL"
+        return _LEVELS[bisect.bisect(_LEVEL_CUM_WEIGHTS, self._random.random())]
     
     def _generate_metadata(self, emitter_id: str, log_count: int) -> dict:
         """Generate metadata for the log."""
+        rng = self._random
         return {
             "emitter_id": emitter_id,
             "sequence": log_count,
-            "request_id": f"req-{random.randint(10000, 99999)}",
-            "duration_ms": random.randint(1, 1000),
-            "status_code": random.choice([200, 200, 200, 201, 304, 400, 404, 500])
+            "request_id": f"req-{rng.randint(10000, 99999)}",
+            "duration_ms": rng.randint(1, 1000),
+            "status_code": rng.choice(_STATUS_CODES)
         }
     
+    async def wait_for_emitted(self, count: int, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until at least count logs have been emitted.
+        
+        Only one caller should wait at a time.
+        
+        Args:
+            count: Total number of emitted logs to wait for
+            timeout: Maximum seconds to wait (None waits forever)
+            
+        Returns:
+            True if the count was reached, False on timeout
+        """
+        if self.total_emitted >= count:
+            return True
+        
+        self._emit_target = count
+        self._emit_target_reached.clear()
+        try:
+            await asyncio.wait_for(self._emit_target_reached.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self._emit_target = None
+    
     def get_stats(self) -> dict:
         """Get statistics for all emitters."""
         return {
             "total_emitted": self.total_emitted,
+            "total_dropped": self.total_dropped,
             "num_emitters": self.num_emitters,
             "emitter_stats": self.emitter_stats,
             "is_running": self.running
@@ -9,11 +9,13 @@ This script tests:
 """
 import asyncio
 import httpx
+import orjson
+import random
 import time
 import logging
 import argparse
 from datetime import datetime
-from typing import List
+from typing import Optional
 
 # Configure logging
 logging.basicConfig(
@@ -26,26 +28,50 @@ logger = logging.getLogger(__name__)
 logging.getLogger("httpx").setLevel(logging.WARNING)
 logging.getLogger("httpcore").setLevel(logging.WARNING)
 
+# Synthetic log content
+_LEVELS = ("DEBUG", "INFO", "WARN", "ERROR")
+_SOURCES = ("web-app", "api-server", "database", "cache", "worker")
+
+# Request bodies are serialized with orjson and sent as raw content
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
 
 class LoadTester:
     """Load tester for the distributor system."""
     
-    def __init__(self, distributor_url: str = "http://localhost:8000"):
+    def __init__(
+        self,
+        distributor_url: str = "http://localhost:8000",
+        seed: Optional[int] = None
+    ):
         self.distributor_url = distributor_url
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Pool sized for the highest --concurrent values, so burst tests
+        # reuse warm connections instead of opening one per extra request
+        self.client = httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(
+                max_connections=1000,
+                max_keepalive_connections=200,
+                keepalive_expiry=30.0
+            )
+        )
         
         # Statistics
         self.logs_sent = 0
         self.logs_succeeded = 0
         self.logs_failed = 0
         self.start_time = None
+        
+        # Private generator for synthetic log content
+        self._random = random.Random(seed)
     
     async def send_log(self, log_data: dict) -> bool:
         """Send a single log to the distributor."""
         try:
             response = await self.client.post(
                 f"{self.distributor_url}/submit",
-                json=log_data
+                content=orjson.dumps(log_data),
+                headers=_JSON_HEADERS
             )
             
             if response.status_code == 200:
@@ -56,36 +82,55 @@ class LoadTester:
                 return False
                 
         except Exception as e:
-            logger.debug(f"Error sending log: {e}")
+            logger.debug("Error sending log: %s", e)
             self.logs_failed += 1
             return False
     
-    async def generate_and_send_log(self, index: int):
-        """Generate and send a synthetic log."""
-        import random
-        
-        levels = ["DEBUG", "INFO", "WARN", "ERROR"]
-        sources = ["web-app", "api-server", "database", "cache", "worker"]
-        
-        log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
-            "level": random.choice(levels),
+    async def send_log_batch(self, logs: list) -> bool:
+        """Send several logs to the distributor in one request."""
+        try:
+            response = await self.client.post(
+                f"{self.distributor_url}/ingest/batch",
+                content=orjson.dumps({"logs": logs}),
+                headers=_JSON_HEADERS
+            )
+            
+            if response.status_code == 200:
+                self.logs_succeeded += len(logs)
+                return True
+            else:
+                self.logs_failed += len(logs)
+                return False
+                
+        except Exception as e:
+            logger.debug("Error sending log batch: %s", e)
+            self.logs_failed += len(logs)
+            return False
+    
+    def _build_log(self, index: int) -> dict:
+        """Build a synthetic log."""
+        return {
+            "timestamp": datetime.utcnow(),  # Serialized by orjson (ISO 8601)
+            "level": self._random.choice(_LEVELS),
             "message": f"Load test log message #{index}",
-            "source": random.choice(sources),
+            "source": self._random.choice(_SOURCES),
             "metadata": {
                 "test_id": f"load-test-{index}",
                 "iteration": index
             }
         }
-        
+    
+    async def generate_and_send_log(self, index: int):
+        """Generate and send a synthetic log."""
         self.logs_sent += 1
-        return await self.send_log(log_data)
+        return await self.send_log(self._build_log(index))
     
     async def run_load_test(
         self,
         total_logs: int = 1000,
         concurrent_requests: int = 50,
-        burst_mode: bool = False
+        burst_mode: bool = False,
+        batch_size: int = 1
     ):
         """
         Run a load test.
@@ -94,6 +139,7 @@ class LoadTester:
             total_logs: Total number of logs to send
             concurrent_requests: Max concurrent requests
             burst_mode: If True, send all at once; if False, rate limit
+            batch_size: Logs per request in burst mode (>1 posts to /ingest/batch)
         """
         logger.info("="*60)
         logger.info("Starting Load Test")
@@ -101,13 +147,15 @@ class LoadTester:
         logger.info(f"Total logs: {total_logs}")
         logger.info(f"Concurrent requests: {concurrent_requests}")
         logger.info(f"Burst mode: {burst_mode}")
+        if burst_mode:
+            logger.info(f"Batch size: {batch_size}")
         logger.info("="*60)
         
         self.start_time = time.time()
         
         if burst_mode:
             # Send all logs as fast as possible
-            await self._burst_load(total_logs, concurrent_requests)
+            await self._burst_load(total_logs, concurrent_requests, batch_size)
         else:
             # Send with controlled rate
             await self._controlled_load(total_logs, concurrent_requests)
@@ -115,24 +163,39 @@ class LoadTester:
         elapsed = time.time() - self.start_time
         self._print_summary(elapsed)
     
-    async def _burst_load(self, total_logs: int, concurrency: int):
+    async def _burst_load(self, total_logs: int, concurrency: int, batch_size: int = 1):
         """Send logs in burst mode (as fast as possible)."""
-        semaphore = asyncio.Semaphore(concurrency)
+        # A fixed pool of workers shares one iterator of batch start indices,
+        # so only `concurrency` tasks exist however many logs are sent
+        batch_size = max(1, batch_size)
+        starts = iter(range(0, total_logs, batch_size))
+        next_progress = 100
         
-        async def send_with_semaphore(index: int):
-            async with semaphore:
-                await self.generate_and_send_log(index)
+        async def worker():
+            nonlocal next_progress
+            for start in starts:
+                if batch_size == 1:
+                    await self.generate_and_send_log(start)
+                else:
+                    # Build the whole batch up front; one request carries it
+                    end = min(start + batch_size, total_logs)
+                    logs = [self._build_log(i) for i in range(start, end)]
+                    self.logs_sent += len(logs)
+                    await self.send_log_batch(logs)
                 
-                if (index + 1) % 100 == 0:
+                if self.logs_sent >= next_progress:
+                    next_progress = (self.logs_sent // 100 + 1) * 100
                     elapsed = time.time() - self.start_time
-                    rate = (index + 1) / elapsed if elapsed > 0 else 0
+                    rate = self.logs_sent / elapsed if elapsed > 0 else 0
                     logger.info(
-                        f"Progress: {index + 1}/{total_logs} "
-                        f"({rate:.1f} logs/sec)"
+                        "Progress: %d/%d (%.1f logs/sec)",
+                        self.logs_sent, total_logs, rate
                     )
         
-        tasks = [send_with_semaphore(i) for i in range(total_logs)]
-        await asyncio.gather(*tasks)
+        num_batches = (total_logs + batch_size - 1) // batch_size
+        async with asyncio.TaskGroup() as tg:
+            for _ in range(min(concurrency, num_batches)):
+                tg.create_task(worker())
     
     async def _controlled_load(self, total_logs: int, rate_limit: int):
         """Send logs with controlled rate."""
@@ -155,8 +218,8 @@ class LoadTester:
                 elapsed = time.time() - self.start_time
                 rate = end_idx / elapsed if elapsed > 0 else 0
                 logger.info(
-                    f"Progress: {end_idx}/{total_logs} "
-                    f"({rate:.1f} logs/sec)"
+                    "Progress: %d/%d (%.1f logs/sec)",
+                    end_idx, total_logs, rate
                 )
             
             # Small delay between batches
@@ -242,10 +305,8 @@ class LoadTester:
         await self.client.aclose()
 
 
-async def run_comprehensive_test():
-    """Run a comprehensive test suite."""
-    tester = LoadTester()
-    
+async def run_comprehensive_test(tester: LoadTester):
+    """Run a comprehensive test suite (closes the tester when done)."""
     try:
         logger.info("\n" + "="*60)
         logger.info("COMPREHENSIVE LOAD TEST SUITE")
@@ -315,6 +376,18 @@ async def main():
         action="store_true",
         help="Burst mode (send as fast as possible)"
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1,
+        help="Logs per request in burst mode (>1 uses /ingest/batch)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=None,
+        help="Seed for the synthetic log content (repeatable runs)"
+    )
     parser.add_argument(
         "--comprehensive",
         action="store_true",
@@ -329,28 +402,32 @@ async def main():
     
     args = parser.parse_args()
     
+    # One tester (and HTTP client) for the preflight check and the test run
+    tester = LoadTester(args.url, seed=args.seed)
+    
     # Check if distributor is running
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{args.url}/health", timeout=2.0)
-            if response.status_code != 200:
-                logger.error("Distributor is not healthy!")
-                return
+        response = await tester.client.get(f"{args.url}/health", timeout=2.0)
+        if response.status_code != 200:
+            logger.error("Distributor is not healthy!")
+            await tester.close()
+            return
     except Exception:
         logger.error(f"Cannot connect to distributor at {args.url}")
         logger.error("Please start the distributor first:")
         logger.error("  python -m uvicorn distributor.distributor:app --port 8000")
+        await tester.close()
         return
     
     if args.comprehensive:
-        await run_comprehensive_test()
+        await run_comprehensive_test(tester)
     else:
-        tester = LoadTester(args.url)
         try:
             await tester.run_load_test(
                 total_logs=args.logs,
                 concurrent_requests=args.concurrent,
-                burst_mode=args.burst
+                burst_mode=args.burst,
+                batch_size=args.batch_size
             )
             await tester.verify_processing(args.wait)
             await tester.print_final_stats()
@@ -15,6 +15,9 @@ if __name__ == "__main__":
         "distributor.distributor:app",
         host="0.0.0.0",
         port=8000,
+        loop="auto",      # uvloop when installed (uvicorn[standard], not on Windows)
+        http="httptools", # C HTTP/1.1 parser from uvicorn[standard]
+        workers=1,        # The queue lives in process memory: one worker only
         log_level="info",
         access_log=False  # Disable access logs
     )